@@ -1,14 +1,15 @@
 """Setup for pytest."""
 import os
 
-import pytest
-
 from copulpy.clsUtilityCopula import UtilityCopulaCls     # noqa: F401
 from copulpy.config_copulpy import PACKAGE_DIR
 
 
 def test():
     """Run basic tests for the package."""
+    # We only import pytest here, as it is not needed otherwise.
+    import pytest
+
     base = os.getcwd()
 
     os.chdir(PACKAGE_DIR)
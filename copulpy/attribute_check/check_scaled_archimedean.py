@@ -1,12 +1,12 @@
 """Check attributes and properties of the scaled archimedean copula."""
 import numpy as np
 
-from copulpy.config_copulpy import IS_DEBUG
+from copulpy.shared.validation import get_validation_mode
 
 
 def check_attributes_scaled_archimedean(self, t=0, is_normalized=False):
     """Check the attributes of the class."""
-    if not IS_DEBUG:
+    if get_validation_mode() not in ['full']:
         return
 
     u_1, u_2 = self.get_attr('u_1', 'u_2')
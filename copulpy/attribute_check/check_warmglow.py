@@ -1,12 +1,12 @@
 """Check attributes and properties of the warmglow utility function."""
 import numpy as np
 
-from copulpy.config_copulpy import IS_DEBUG
+from copulpy.shared.validation import get_validation_mode
 
 
 def check_attributes_warmglow(self):
     """Check attributes."""
-    if not IS_DEBUG:
+    if get_validation_mode() not in ['full']:
         return
 
     alpha, beta, gamma, y_scale, discount_factors = \
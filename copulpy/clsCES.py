@@ -1,20 +1,20 @@
 """Provide the constant elasticity of substitution function."""
 import numpy as np
 
-from copulpy.config_copulpy import IS_DEBUG
-from copulpy.clsMeta import MetaCls
+from copulpy.shared.validation import get_validation_mode
+from copulpy.shared.validation import assert_range
+from copulpy.clsMeta import SlotsMetaCls
 
 
-class CESCls(MetaCls):
+class CESCls(SlotsMetaCls):
     """CES class."""
+    __slots__ = ('discount_factor', 'y_weight', 'alpha')
 
     def __init__(self, alpha, y_weight, discount_factor):
         """Initialize class."""
-        self.attr = dict()
-
-        self.attr['discount_factor'] = discount_factor
-        self.attr['y_weight'] = y_weight
-        self.attr['alpha'] = alpha
+        self.discount_factor = discount_factor
+        self.y_weight = y_weight
+        self.alpha = alpha
 
         self._check_attributes()
 
@@ -22,17 +22,17 @@ class CESCls(MetaCls):
         """Evaluate the CES function."""
         self._additional_checks('evaluate_in', v_1, v_2)
 
-        y_weight, discount_factor, alpha = self.get_attr('y_weight', 'discount_factor', 'alpha')
+        y_weight, discount_factor, alpha = self.y_weight, self.discount_factor, self.alpha
 
         rslt = (v_1 ** alpha + y_weight * v_2 ** alpha) ** (1 / alpha)
         rslt = discount_factor * rslt
-        self._additional_checks('evaluate_out')
+        self._additional_checks('evaluate_out', rslt)
 
         return rslt
 
     def _check_attributes(self):
         """Check the attributes of the class."""
-        alpha, y_weights, discount_factors = self.get_attr('alpha', 'y_weight', 'discount_factor')
+        alpha, y_weights, discount_factors = self.alpha, self.y_weight, self.discount_factor
         np.testing.assert_equal(alpha >= 0, True)
         np.testing.assert_equal(np.all(y_weights >= 0), True)
         np.testing.assert_equal(np.all(discount_factors >= 0), True)
@@ -41,7 +41,18 @@ class CESCls(MetaCls):
     def _additional_checks(label, *args):
         """Perform some additional checks on selected features of the class instance."""
         # We only run these tests during debugging as otherwise the performance deteriorates.
-        if not IS_DEBUG:
+        mode = get_validation_mode()
+        if mode in ['off']:
+            return
+
+        # In the batch mode, the request and the return value are validated in a single pass each.
+        if mode in ['batch']:
+            if label in ['evaluate_in']:
+                for var in args:
+                    assert_range(var, 0.0)
+            elif label in ['evaluate_out']:
+                rslt, = args
+                assert_range(rslt, 0.0)
             return
 
         if label in ['evaluate_in']:
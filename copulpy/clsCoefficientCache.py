@@ -0,0 +1,78 @@
+"""This module houses the cache for the fitted coefficients of the scaled Archimedean copula."""
+import pickle as pkl
+import tempfile
+import atexit
+import os
+
+from copulpy.config_copulpy import COEFFICIENT_CACHE_SIZE
+from copulpy.config_copulpy import COEFFICIENT_CACHE_FILE
+from copulpy.clsLRUCache import LRUCacheCls
+
+# The version is increased whenever the solver or the format of the persisted coefficients changes,
+# so that coefficients from earlier versions are fitted again.
+COEFFICIENT_CACHE_VERSION = 3
+
+
+class CoefficientCacheCls(LRUCacheCls):
+    """This class manages a bounded LRU cache of fitted copula coefficients."""
+
+    def __init__(self, max_size=COEFFICIENT_CACHE_SIZE, fname=None):
+        """Init class."""
+        super().__init__(max_size)
+        self.attr['fname'] = fname
+
+        if fname is not None and os.path.exists(fname):
+            self.load(fname)
+
+    @staticmethod
+    def get_key(generating_function, u_1, u_2, delta):
+        """Construct the canonical key for the parameters of a copula."""
+        return int(generating_function), float(u_1), float(u_2), float(delta)
+
+    def set(self, key, m):
+        """Add the coefficients for a key and evict the least recently used ones if needed."""
+        super().set(key, tuple(m))
+
+    def save(self, fname=None):
+        """Persist the coefficients to a file.
+
+        The coefficients are written to a temporary file, which then replaces the file at once. So
+        processes that save at the same time never leave a partially written file behind.
+        """
+        fname = fname or self.attr['fname']
+
+        dirname = os.path.dirname(os.path.abspath(fname))
+        with tempfile.NamedTemporaryFile('wb', dir=dirname, delete=False) as outfile:
+            try:
+                pkl.dump((COEFFICIENT_CACHE_VERSION, list(self.attr['store'].items())), outfile)
+            except BaseException:
+                outfile.close()
+                os.remove(outfile.name)
+                raise
+
+        os.replace(outfile.name, fname)
+
+    def load(self, fname=None):
+        """Load previously persisted coefficients from a file.
+
+        A file that cannot be read or stems from another version is treated as an empty cache.
+        """
+        fname = fname or self.attr['fname']
+        try:
+            with open(fname, 'rb') as infile:
+                version, items = pkl.load(infile)
+            items = [(tuple(key), tuple(m)) for key, m in items]
+        except Exception:
+            return
+
+        if version != COEFFICIENT_CACHE_VERSION:
+            return
+
+        for key, m in items:
+            self.set(key, m)
+
+
+# There is a single cache for the whole process, which is persisted at exit if requested.
+COEFFICIENT_CACHE = CoefficientCacheCls(fname=COEFFICIENT_CACHE_FILE)
+if COEFFICIENT_CACHE_FILE is not None:
+    atexit.register(COEFFICIENT_CACHE.save)
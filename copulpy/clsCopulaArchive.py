@@ -0,0 +1,252 @@
+"""This module houses the class for the compact archive of fitted copulas."""
+import io
+
+import numpy as np
+
+from copulpy.clsScaledArchimedean import ScaledArchimedeanCls
+from copulpy.clsNonstationaryUtil import NonstationaryUtilCls
+from copulpy.clsPeriodFunction import get_discount_function
+from copulpy.shared.auxiliary import build_copula_spec
+from copulpy.clsUtilityCopula import UtilityCopulaCls
+from copulpy.clsWarmglowUtil import WarmglowUtilCls
+from copulpy.clsPeriodTable import PeriodTableCls
+from copulpy.clsExponential import ExponentialCls
+from copulpy.clsPower import PowerCls
+from copulpy.clsMeta import MetaCls
+
+# The format version is increased whenever the layout of the archive changes.
+FORMAT_VERSION = 2
+
+# The tables of period-specific parameters are stored in a sparse format.
+TABLES = ['discount', 'weight', 'y_weight']
+
+
+class CopulaArchiveCls(MetaCls):
+    """This class stores many fitted copulas in a compact columnar format.
+
+    Each parameter is a column with one entry per copula, which is NaN or empty where it does not
+    apply. Besides the specification, the archive stores all derived quantities, i.e. the share
+    parameters and the denominator of the scaled Archimedean copulas, the normalization of the
+    marginals, and the tables of discount factors and weights. Each table is stored in a sparse
+    format, i.e. the periods and values of all copulas are concatenated and the offsets mark where
+    the entries of each copula start, so its size does not depend on the longest horizon. The
+    archive is saved as an uncompressed .npz file without any pickled objects.
+
+    Loading an archive only reads the columns. Each copula is restored on first access without
+    fitting, validation or logging, so loading is fast even for a large number of copulas.
+    """
+
+    def __init__(self, columns):
+        """Init class."""
+        format_version = int(columns['format_version'])
+        if format_version != FORMAT_VERSION:
+            raise NotImplementedError
+
+        self.attr = dict()
+        self.attr['columns'] = columns
+        self.attr['num_copulas'] = columns['version'].size
+
+        # The copulas are restored on first access only.
+        self.attr['copulas'] = dict()
+
+    @classmethod
+    def from_copulas(cls, copulas):
+        """Collect the columns of a list of copulas."""
+        num_copulas = len(copulas)
+
+        columns = dict()
+        columns['version'] = np.array([copula.version for copula in copulas], dtype=str)
+
+        # Scaled Archimedean copulas
+        columns['generating_function'] = np.tile(0, num_copulas)
+        columns['marginals'] = np.tile('', (num_copulas, 2)).astype('<U11')
+        columns['normalization'] = np.tile(np.nan, (num_copulas, 2, 2))
+        for label in ['delta', 'denominator', 'a', 'b']:
+            columns[label] = np.tile(np.nan, num_copulas)
+        for label in ['u', 'm', 'r', 'bounds']:
+            columns[label] = np.tile(np.nan, (num_copulas, 2))
+
+        # Nonstationary and warm glow utility functions
+        columns['discounting'] = np.tile('', num_copulas).astype('<U11')
+        columns['warmglow_type'] = np.tile('', num_copulas).astype('<U8')
+        for label in ['alpha', 'beta', 'gamma', 'y_scale']:
+            columns[label] = np.tile(np.nan, num_copulas)
+        rows = {label: [] for label in TABLES}
+
+        for i, copula in enumerate(copulas):
+            tables = dict()
+            if copula.version in ['scaled_archimedean']:
+                marginals = copula.x_uniattribute_utility, copula.y_uniattribute_utility
+                columns['generating_function'][i] = copula.copula.generating_function_id
+                columns['marginals'][i] = copula.marginals
+                columns['normalization'][i] = [marginal.normalization for marginal in marginals]
+                columns['delta'][i] = copula.delta
+                columns['denominator'][i] = copula.copula.denominator
+                columns['a'][i] = marginals[0].a
+                columns['b'][i] = marginals[0].b
+                columns['u'][i] = copula.u_1, copula.u_2
+                columns['m'][i] = copula.copula.m
+                columns['r'][i] = [marginal.r for marginal in marginals]
+                columns['bounds'][i] = copula.bounds
+            else:
+                for label in ['alpha', 'beta', 'gamma', 'y_scale']:
+                    columns[label][i] = getattr(copula, label)
+                columns['discounting'][i] = copula.discounting or ''
+                if copula.version in ['warmglow']:
+                    columns['warmglow_type'][i] = copula.copula.warmglow_type
+
+                tables['discount'] = copula.discount_factors
+                tables['weight'] = copula.unrestricted_weights or {}
+
+                # The weights on y are only stored if they are tabulated.
+                y_weights = copula.copula.y_weights
+                if isinstance(y_weights, PeriodTableCls):
+                    tables['y_weight'] = y_weights
+
+            for label in TABLES:
+                rows[label] += [sorted(tables.get(label, {}).items())]
+
+        for label in TABLES:
+            items = [item for row in rows[label] for item in row]
+            columns[label + '_offsets'] = np.cumsum([0] + [len(row) for row in rows[label]])
+            columns[label + '_periods'] = np.array([t for t, _ in items], dtype=int)
+            columns[label + '_values'] = np.array([value for _, value in items], dtype=float)
+
+        columns['format_version'] = np.array(FORMAT_VERSION)
+
+        return cls(columns)
+
+    def save(self, fname):
+        """Save the archive to a .npz file."""
+        np.savez(fname, **self.attr['columns'])
+
+    @classmethod
+    def load(cls, fname):
+        """Load an archive from a .npz file."""
+        with np.load(fname, allow_pickle=False) as archive:
+            columns = {label: archive[label] for label in archive.files}
+
+        return cls(columns)
+
+    def to_bytes(self):
+        """Get the archive as bytes in the format of a .npz file."""
+        buffer = io.BytesIO()
+        self.save(buffer)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Load an archive from bytes in the format of a .npz file."""
+        return cls.load(io.BytesIO(data))
+
+    def get_copula_spec(self, i):
+        """Get the specification of a single copula."""
+        columns = self.attr['columns']
+
+        version = columns['version'][i].item()
+
+        kwargs = dict()
+        if version in ['scaled_archimedean']:
+            kwargs['generating_function'] = columns['generating_function'][i].item()
+            for label in ['marginals', 'bounds', 'u', 'r']:
+                kwargs[label] = np.array(columns[label][i])
+            for label in ['delta', 'a', 'b']:
+                kwargs[label] = columns[label][i].item()
+
+        elif version in ['nonstationary', 'warmglow']:
+            for label in ['alpha', 'beta', 'gamma', 'y_scale']:
+                kwargs[label] = columns[label][i].item()
+            kwargs['discounting'] = columns['discounting'][i].item() or None
+            if version in ['warmglow']:
+                kwargs['warmglow_type'] = columns['warmglow_type'][i].item()
+
+            periods, values = _get_period_arrays(columns, 'discount', i)
+            kwargs['discount_factors'] = dict(zip(periods.tolist(), values.tolist()))
+
+            periods, values = _get_period_arrays(columns, 'weight', i)
+            kwargs['unrestricted_weights'] = None
+            if periods.size > 0:
+                kwargs['unrestricted_weights'] = dict(zip(periods.tolist(), values.tolist()))
+        else:
+            raise NotImplementedError
+
+        return build_copula_spec(version, **kwargs)
+
+    def __getitem__(self, i):
+        """Get a single copula, which is restored on first access."""
+        if not 0 <= i < self.attr['num_copulas']:
+            raise IndexError(i)
+
+        copulas = self.attr['copulas']
+        if i not in copulas:
+            copulas[i] = self._restore(i)
+
+        return copulas[i]
+
+    def __iter__(self):
+        """Iterate over the copulas."""
+        return (self[i] for i in range(len(self)))
+
+    def __len__(self):
+        """Get the number of copulas."""
+        return self.attr['num_copulas']
+
+    def _restore(self, i):
+        """Restore a single copula from its columns."""
+        columns = self.attr['columns']
+
+        copula_spec = self.get_copula_spec(i)
+        version = copula_spec['version']
+
+        if version in ['scaled_archimedean']:
+            a, b = [columns[label][i].item() for label in ['a', 'b']]
+
+            marginal_utility = []
+            for marginal, r, upper_bound, normalization in zip(
+                    columns['marginals'][i].tolist(), columns['r'][i].tolist(),
+                    columns['bounds'][i].tolist(), columns['normalization'][i].tolist()):
+                klass = PowerCls if marginal in ['power'] else ExponentialCls
+                marginal_utility += [klass.restore(r, a, b, upper_bound, normalization)]
+
+            copula = ScaledArchimedeanCls.restore(
+                columns['generating_function'][i].item(), *columns['u'][i].tolist(),
+                columns['delta'][i].item(), columns['m'][i].tolist(),
+                columns['denominator'][i].item())
+
+            return UtilityCopulaCls.restore(copula_spec, copula, marginal_utility)
+
+        elif version in ['nonstationary', 'warmglow']:
+            spec = copula_spec[version]
+            args = [spec[label] for label in ['alpha', 'beta', 'gamma']]
+
+            if spec['discounting'] is None:
+                discount_factors = PeriodTableCls.from_arrays(
+                    *_get_period_arrays(columns, 'discount', i))
+            else:
+                discount_factors = get_discount_function(spec['discounting'],
+                                                         spec['discount_factors'])
+            args += [discount_factors, spec['y_scale'], spec['unrestricted_weights']]
+
+            if version in ['warmglow']:
+                args += [spec['warmglow_type']]
+
+            # The weights on y are derived from the discount function if they are not tabulated.
+            y_weights = None
+            periods, values = _get_period_arrays(columns, 'y_weight', i)
+            if periods.size > 0:
+                y_weights = PeriodTableCls.from_arrays(periods, values)
+
+            klass = NonstationaryUtilCls if version in ['nonstationary'] else WarmglowUtilCls
+            copula = klass.restore(*args, y_weights=y_weights)
+
+            return UtilityCopulaCls.restore(copula_spec, copula)
+        else:
+            raise NotImplementedError
+
+
+def _get_period_arrays(columns, label, i):
+    """Get the periods and the values of a single copula from a sparse table."""
+    start, stop = columns[label + '_offsets'][i:i + 2].tolist()
+    periods = np.array(columns[label + '_periods'][start:stop])
+    values = np.array(columns[label + '_values'][start:stop])
+    return periods, values
@@ -0,0 +1,68 @@
+"""This module houses the cache for the copulas that are constructed from their specification."""
+from numbers import Number
+import copy
+
+import numpy as np
+
+from copulpy.config_copulpy import COPULA_CACHE_SIZE
+from copulpy.clsUtilityCopula import UtilityCopulaCls
+from copulpy.clsLRUCache import LRUCacheCls
+
+
+class CopulaCacheCls(LRUCacheCls):
+    """This class manages a bounded LRU cache of copulas, which are keyed by their specification.
+
+    The cached copulas are frozen, as they are shared by all requests for the same specification.
+    They are constructed from a copy of the specification, so they share no arrays with the caller.
+    """
+
+    def __init__(self, max_size=COPULA_CACHE_SIZE):
+        """Init class."""
+        super().__init__(max_size)
+
+    @staticmethod
+    def get_key(copula_spec):
+        """Construct the canonical key for the specification of a copula."""
+        return get_canonical(copula_spec)
+
+    def get_copula(self, copula_spec):
+        """Get the copula for a specification, which is only constructed if it is not cached."""
+        key = self.get_key(copula_spec)
+
+        copula = self.get(key)
+        if copula is None:
+            copula = UtilityCopulaCls(copy.deepcopy(copula_spec))
+            copula.freeze()
+            self.set(key, copula)
+
+        return copula
+
+
+def get_canonical(obj):
+    """Get a canonical and hashable representation of a nested specification.
+
+    Dictionaries are sorted by their keys, while arrays, lists and tuples are represented by the
+    tuple of their elements. NumPy scalars and strings are converted to their Python counterparts.
+    """
+    if isinstance(obj, dict):
+        items = [(get_canonical(key_), get_canonical(value)) for key_, value in obj.items()]
+        return ('dict',) + tuple(sorted(items, key=lambda item: repr(item[0])))
+    elif isinstance(obj, np.ndarray):
+        return ('array', obj.shape) + tuple(get_canonical(value) for value in obj.ravel())
+    elif isinstance(obj, (list, tuple)):
+        return ('array', (len(obj),)) + tuple(get_canonical(value) for value in obj)
+    elif isinstance(obj, np.generic):
+        return obj.item()
+    elif obj is None or isinstance(obj, (Number, str)):
+        return obj
+    else:
+        raise NotImplementedError
+
+
+def get_copula(copula_spec):
+    """Get the frozen copula for a specification from the cache of the whole process."""
+    return COPULA_CACHE.get_copula(copula_spec)
+
+
+# There is a single cache for the whole process.
+COPULA_CACHE = CopulaCacheCls()
@@ -0,0 +1,118 @@
+"""This module houses the class for the estimation of utility functions from choice data."""
+import numpy as np
+
+from copulpy.estimation.estimation_likelihood import get_log_likelihood_gradient
+from copulpy.estimation.estimation_likelihood import get_choice_probabilities
+from copulpy.estimation.estimation_likelihood import get_log_likelihood
+from copulpy.clsUtilityCopula import UtilityCopulaCls
+from copulpy.config_copulpy import HUGE_FLOAT
+from copulpy.clsMeta import MetaCls
+
+
+class EstimationCls(MetaCls):
+    """This class manages the estimation of a utility function from discrete choice data.
+
+    The data consists of N choice situations with K options each. The bundles x and y are arrays of
+    shape (N, K), the periods are either of shape (N,) or (N, K), and the choices are the indices of
+    the chosen options. The choices follow a logit model with the utilities divided by the
+    choice scale.
+    """
+
+    def __init__(self, copula_spec, x, y, t, choices, free_params=None, choice_scale=1.0):
+        """Init class."""
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        choices = np.asarray(choices)
+
+        t = np.asarray(t)
+        if t.ndim < x.ndim:
+            t = t[:, None]
+        t = np.broadcast_to(t, x.shape)
+
+        self.attr = dict()
+        self.attr['copula'] = UtilityCopulaCls(copula_spec)
+        self.attr['choice_scale'] = choice_scale
+        self.attr['free_params'] = free_params or ['alpha', 'beta', 'gamma', 'y_scale']
+        self.attr['choices'] = choices
+        self.attr['x'] = x
+        self.attr['y'] = y
+        self.attr['t'] = t
+
+        self._check_attributes()
+
+    def get_utilities(self, **params):
+        """Get the utilities of all options, where parameters can be replaced by arrays."""
+        copula, x, y, t = self.get_attr('copula', 'x', 'y', 't')
+
+        if params:
+            return copula.evaluate_grid(x=x, y=y, t=t, **params)
+
+        return copula.evaluate(x=x, y=y, t=t)
+
+    def get_choice_probabilities(self, **params):
+        """Get the choice probabilities of all options."""
+        utils, choice_scale = self._get_utilities_and_scale(params)
+        return get_choice_probabilities(utils, choice_scale)
+
+    def get_log_likelihood(self, **params):
+        """Get the total log-likelihood of the choices."""
+        utils, choice_scale = self._get_utilities_and_scale(params)
+        return get_log_likelihood(utils, self.attr['choices'], choice_scale)
+
+    def criterion(self, x):
+        """Criterion function for the estimation, i.e. the negative log-likelihood."""
+        params = dict(zip(self.attr['free_params'], x))
+
+        rslt = -self.get_log_likelihood(**params)
+
+        # Optimizers cope better with a large but finite value outside the admissible region.
+        if not np.isfinite(rslt):
+            rslt = HUGE_FLOAT
+
+        return rslt
+
+    def criterion_gradient(self, x):
+        """Gradient of the criterion function with respect to the free parameters.
+
+        This is available for the scalar parameters alpha, beta, gamma, y_scale, and choice_scale.
+        """
+        copula, free_params, choices = self.get_attr('copula', 'free_params', 'choices')
+
+        params = dict(zip(free_params, x))
+        choice_scale = params.pop('choice_scale', self.attr['choice_scale'])
+
+        utils, grad = copula.evaluate_gradient(self.attr['x'], self.attr['y'], self.attr['t'],
+                                               **params)
+        probs = get_choice_probabilities(utils, choice_scale)
+
+        rslt = []
+        for label in free_params:
+            if label in ['choice_scale']:
+                grad_v = -utils / choice_scale ** 2
+            else:
+                grad_v = grad[label] / choice_scale
+            rslt += [-get_log_likelihood_gradient(grad_v, probs, choices)]
+
+        return np.array(rslt)
+
+    def _get_utilities_and_scale(self, params):
+        """Get the utilities and the choice scale aligned with their parameter axes."""
+        params = params.copy()
+        choice_scale = np.asarray(params.pop('choice_scale', self.attr['choice_scale']))
+
+        utils = self.get_utilities(**params)
+
+        # The choice scale is aligned with any parameter axes of the utilities.
+        choice_scale = choice_scale.reshape(choice_scale.shape + (1, 1))
+
+        return utils, choice_scale
+
+    def _check_attributes(self):
+        """Check the attributes of the class."""
+        x, y, choices, choice_scale = self.get_attr('x', 'y', 'choices', 'choice_scale')
+
+        np.testing.assert_equal(x.ndim, 2)
+        np.testing.assert_equal(x.shape, y.shape)
+        np.testing.assert_equal(choices.shape, x.shape[:1])
+        np.testing.assert_equal(np.issubdtype(choices.dtype, np.integer), True)
+        np.testing.assert_equal(np.all((0 <= choices) & (choices < x.shape[1])), True)
+        np.testing.assert_equal(np.all(np.asarray(choice_scale) > 0), True)
@@ -1,47 +1,75 @@
 """This module houses the class for the power utility function."""
+from functools import partial
 from numbers import Number
 import numpy as np
 
-from copulpy.config_copulpy import IS_DEBUG
-from copulpy.clsMeta import MetaCls
+from copulpy.shared.validation import get_validation_mode
+from copulpy.shared.validation import assert_range
+from copulpy.shared.backend import get_kernel
+from copulpy.clsMeta import derived_input
+from copulpy.clsMeta import SlotsMetaCls
 
 
-class ExponentialCls(MetaCls):
+class ExponentialCls(SlotsMetaCls):
     """This class manages the uniattribute utility function."""
+    __slots__ = ('_upper_bound', '_r', 'a', 'b', 'normalization')
+
+    upper_bound = derived_input('upper_bound')
+    r = derived_input('r')
+
     def __init__(self, r, a=1, b=0, upper_bound=None):
+        self._assign_attributes(r, a, b, upper_bound)
 
-        self.attr = dict()
-        self.attr['upper_bound'] = upper_bound
-        self.attr['r'] = r
-        self.attr['a'] = a
-        self.attr['b'] = b
+        self._derive_attributes()
 
-        self._check_attributes()
+    @classmethod
+    def restore(cls, r, a, b, upper_bound, normalization):
+        """Restore the utility function with its precomputed normalization and without checks."""
+        marginal = cls.__new__(cls)
+        marginal._assign_attributes(r, a, b, upper_bound)
+        marginal.normalization = tuple(normalization)
+        return marginal
+
+    def _assign_attributes(self, r, a, b, upper_bound):
+        """Assign the parameters of the utility function."""
+        self._upper_bound = upper_bound
+        self._r = r
+        self.a = a
+        self.b = b
 
     def evaluate(self, x, is_normalized=False):
         """This method evaluates the specified power utility function."""
-        # Check integrity of request and class instance.
+        # Check integrity of request.
         self._additional_checks('evaluate_in', x)
-        self._check_attributes()
 
-        # Distribute class attribute
-        upper_bound = self.get_attr('upper_bound')
+        u = self._evaluate(x, is_normalized)
+
+        self._additional_checks('evaluate_out', u, is_normalized)
 
+        return u
+
+    def _evaluate(self, x, is_normalized):
+        """Evaluate the exponential utility function without any checks."""
         if is_normalized:
-            np.testing.assert_equal(upper_bound is None, False)
-            numerator = self._exponential_utility(x) - self._exponential_utility(0)
-            denominator = self._exponential_utility(upper_bound) - self._exponential_utility(0)
-            u = numerator / denominator
-        else:
-            u = self._exponential_utility(x)
+            # The normalization is precomputed, see _derive_attributes.
+            r, denominator = self.normalization
+            if np.ndim(x) > 0:
+                return get_kernel(exponential_kernel)(x, r, denominator)
+            return exponential_kernel(x, r, denominator)
 
-        self._additional_checks('evaluate_out', u)
+        return self._exponential_utility(x)
 
-        return u
+    def evaluator(self, is_normalized=False):
+        """Get a specialized function that evaluates the utility, where all parameters are bound."""
+        if is_normalized:
+            r, denominator = self.normalization
+            return partial(exponential_kernel, r=r, denominator=denominator)
+
+        return self._exponential_utility
 
     def _exponential_utility(self, x):
         """This method evaluates exponential utility."""
-        r, a, b = self.get_attr('r', 'a', 'b')
+        r, a, b = self.r, self.a, self.b
 
         if r > 0.0:
             rslt = a * (1.0 - np.exp(- r * x)) / r + b
@@ -52,9 +80,25 @@ class ExponentialCls(MetaCls):
 
         return rslt
 
+    def _derive_attributes(self):
+        """This method checks the attributes and precomputes the normalization of the utility
+        function."""
+        self._check_attributes()
+
+        r, upper_bound = self.r, self.upper_bound
+
+        # The linear transformation cancels in the normalized utility, which is thus the ratio of
+        # the utility kernels at x and upper_bound.
+        if r > 0.0:
+            denominator = 1.0 - np.exp(- r * upper_bound)
+        else:
+            denominator = upper_bound
+
+        self.normalization = r, denominator
+
     def _check_attributes(self):
         """This function checks the attributes of the class."""
-        r, a, b, upper_bound = self.get_attr('r', 'a', 'b', 'upper_bound')
+        r, a, b, upper_bound = self.r, self.a, self.b, self.upper_bound
 
         for var in [r, a, b, upper_bound]:
             np.testing.assert_equal(isinstance(var, Number), True)
@@ -72,19 +116,39 @@ class ExponentialCls(MetaCls):
         """This method performs some additional checks on selected features of the class
         instance."""
         # We only run these tests during debugging as otherwise the performance deteriorates.
-        if not IS_DEBUG:
+        mode = get_validation_mode()
+        if mode in ['off']:
+            return
+
+        # In the batch mode, the request and the return value are validated in a single pass each.
+        if mode in ['batch']:
+            if label in ['evaluate_in']:
+                x, = args
+                assert_range(x, 0.0, self.upper_bound)
+            elif label in ['evaluate_out']:
+                u = args[0]
+                assert_range(u)
             return
 
         # Distribute class attributes
-        upper_bound = self.get_attr('upper_bound')
+        upper_bound = self.upper_bound
 
         if label in ["evaluate_out"]:
-            u, = args
+            u, is_normalized = args
             np.testing.assert_equal(np.isfinite(u), True)
-            np.testing.assert_equal(0 <= u <= 1, True)
+            if is_normalized:
+                np.testing.assert_equal(np.all((0 <= u) & (u <= 1)), True)
         elif label in ['evaluate_in']:
             x, = args
             np.testing.assert_equal(x >= 0, True)
             np.testing.assert_equal(x <= upper_bound, True)
         else:
             raise NotImplementedError
+
+
+def exponential_kernel(x, r, denominator):
+    """Evaluate the normalized exponential utility elementwise."""
+    if r > 0.0:
+        return (1.0 - np.exp(- r * x)) / denominator
+
+    return x / denominator
@@ -0,0 +1,63 @@
+"""This module houses the base class for the bounded caches of the package."""
+from collections import OrderedDict
+
+from copulpy.clsMeta import MetaCls
+
+
+class LRUCacheCls(MetaCls):
+    """This class manages a bounded cache, which evicts the least recently used entries first."""
+
+    def __init__(self, max_size):
+        """Init class."""
+        self.attr = dict()
+        self.attr['max_size'] = max_size
+
+        self.attr['evictions'] = 0
+        self.attr['misses'] = 0
+        self.attr['hits'] = 0
+
+        # The entries are kept in the order of their last use.
+        self.attr['store'] = OrderedDict()
+
+    def get(self, key):
+        """Get the entry for a key, which is None if it is not cached."""
+        store = self.attr['store']
+        if key not in store:
+            self.attr['misses'] += 1
+            return None
+
+        self.attr['hits'] += 1
+        store.move_to_end(key)
+
+        return store[key]
+
+    def set(self, key, value):
+        """Add the entry for a key and evict the least recently used ones if needed."""
+        store = self.attr['store']
+        store[key] = value
+        store.move_to_end(key)
+
+        while len(store) > self.attr['max_size']:
+            store.popitem(last=False)
+            self.attr['evictions'] += 1
+
+    def clear(self):
+        """Remove all entries and reset the statistics."""
+        self.attr['store'].clear()
+        for key_ in ['evictions', 'misses', 'hits']:
+            self.attr[key_] = 0
+
+    def get_statistics(self):
+        """Provide the hit and miss statistics of the cache."""
+        hits, misses, evictions, max_size = \
+            self.get_attr('hits', 'misses', 'evictions', 'max_size')
+
+        stats = dict()
+        stats['hits'] = hits
+        stats['misses'] = misses
+        stats['evictions'] = evictions
+        stats['size'] = len(self.attr['store'])
+        stats['max_size'] = max_size
+        stats['hit_rate'] = hits / max(hits + misses, 1)
+
+        return stats
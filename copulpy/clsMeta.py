@@ -1,20 +1,229 @@
 """This module houses the Meta class for the package."""
+from operator import attrgetter
+
+import numpy as np
 
 
 class MetaCls(object):
     """This class collects all methods that are useful for all other classes in the package."""
+    __slots__ = ()
+
     def get_attr(self, *keys):
         """This method allows to quickly access all class attributes."""
         # We want to be able to pass in list of keys and keys directly.
         if isinstance(keys[0], list):
             keys = keys[0]
 
+        attr = self.attr
         rslt = []
         for key_ in keys:
-            rslt += [self.attr[key_]]
+            rslt += [attr[key_]]
 
         # When only one attribute is requested, we do not need to return a list.
         if len(keys) == 1:
             rslt = rslt[0]
 
         return rslt
+
+    def set_attr(self, key, value):
+        """This method allows to change a class attribute and all attributes derived from it."""
+        self.attr[key] = value
+        self._derive_attributes()
+
+    def _derive_attributes(self):
+        """This method updates all derived attributes after a change to the class attributes."""
+        pass
+
+    def freeze(self):
+        """Make the instance and all its components immutable.
+
+        The components and arrays are frozen in place, while dictionaries and lists are replaced by
+        immutable counterparts. The instance then becomes an instance of a frozen subclass, so
+        there is no cost for setting the attributes of all other instances.
+        """
+        if getattr(self, '_is_frozen', False):
+            return
+
+        if isinstance(self.attr, dict):
+            self.attr = _freeze_value(self.attr)
+        else:
+            # The slots are set directly, so the inputs of derived attributes are not refitted.
+            for key_ in self._get_slots():
+                if hasattr(self, key_):
+                    setattr(self, key_, _freeze_value(getattr(self, key_)))
+
+        self.__class__ = _get_frozen_class(type(self))
+
+
+class SlotsMetaCls(MetaCls):
+    """This class stores the attributes in slots instead of a dictionary per instance.
+
+    The attributes are accessed directly, e.g. self.alpha. For compatibility, the attr property
+    provides a view that behaves like the dictionary of attributes, so get_attr and set_attr work
+    just as for all other classes.
+
+    The inputs of derived attributes are properties, see derived_input, so the derived attributes
+    are also updated when the inputs are set directly, e.g. power.r = 2.0.
+    """
+    __slots__ = ()
+
+    @property
+    def attr(self):
+        """Provide a view on the attributes that behaves like a dictionary."""
+        return AttrViewCls(self)
+
+    def __getstate__(self):
+        """Get the state for pickling."""
+        return {key_: getattr(self, key_) for key_ in self._get_slots() if hasattr(self, key_)}
+
+    def __setstate__(self, state):
+        """Set the state after unpickling."""
+        for key_, value in state.items():
+            setattr(self, key_, value)
+
+    @classmethod
+    def _get_slots(cls):
+        """Get the slots of the class and all its parents."""
+        return [key_ for klass in cls.__mro__ for key_ in getattr(klass, '__slots__', ())]
+
+    @classmethod
+    def _get_labels(cls):
+        """Get the labels of the attributes, where the inputs of derived attributes are public."""
+        rslt = []
+        for key_ in cls._get_slots():
+            if key_.startswith('_') and isinstance(getattr(cls, key_[1:], None), property):
+                key_ = key_[1:]
+            rslt += [key_]
+        return rslt
+
+
+def derived_input(label, update='_derive_attributes'):
+    """Get a property for an input of derived attributes, which are updated whenever it is set.
+
+    The value is stored in the slot of the same label with a leading underscore, which is set
+    directly during the initialization. Setting the property calls the update method afterwards.
+    """
+    key_ = '_' + label
+
+    def fset(self, value):
+        """Set the input and update the derived attributes."""
+        setattr(self, key_, value)
+        getattr(self, update)()
+
+    return property(attrgetter(key_), fset, doc='Input of derived attributes.')
+
+
+def _get_frozen_class(klass):
+    """Get the frozen subclass of a class, which is created once."""
+    if klass not in _FROZEN_CLASSES:
+        def __setattr__(self, key, value):
+            """Refuse to set any attribute."""
+            raise AttributeError('... instance is frozen and cannot be changed')
+
+        def __reduce__(self):
+            """Pickle and copy the instance as an instance of the original class."""
+            state = self.__getstate__() if hasattr(self, '__getstate__') else self.__dict__
+            return _get_frozen_instance, (klass,), state
+
+        def __setstate__(self, state):
+            """Set the state for the original class and freeze the instance again."""
+            object.__setattr__(self, '__class__', klass)
+            if hasattr(klass, '__setstate__'):
+                self.__setstate__(state)
+            else:
+                self.__dict__.update(state)
+            self.freeze()
+
+        namespace = {'__slots__': (), '__setattr__': __setattr__, '__reduce__': __reduce__,
+                     '__setstate__': __setstate__, '_is_frozen': True}
+        _FROZEN_CLASSES[klass] = type('Frozen' + klass.__name__, (klass,), namespace)
+
+    return _FROZEN_CLASSES[klass]
+
+
+def _get_frozen_instance(klass):
+    """Get an empty instance of the frozen subclass, whose state is set afterwards."""
+    frozen_klass = _get_frozen_class(klass)
+    return frozen_klass.__new__(frozen_klass)
+
+
+def _freeze_value(value):
+    """Get the immutable counterpart of a value, where components and arrays are frozen in place."""
+    if isinstance(value, MetaCls):
+        value.freeze()
+    elif isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, dict):
+        value = FrozenDictCls((key_, _freeze_value(item)) for key_, item in value.items())
+    elif isinstance(value, list):
+        value = tuple(_freeze_value(item) for item in value)
+
+    return value
+
+
+# The frozen subclasses are collected here.
+_FROZEN_CLASSES = dict()
+
+
+class FrozenDictCls(dict):
+    """This class provides a dictionary that cannot be changed once it is constructed."""
+    __slots__ = ()
+
+    def _refuse(self, *args, **kwargs):
+        """Refuse to change the dictionary."""
+        raise TypeError('... dictionary is frozen and cannot be changed')
+
+    __setitem__ = __delitem__ = _refuse
+    clear = pop = popitem = setdefault = update = _refuse
+
+    def __reduce__(self):
+        """Pickle and copy the dictionary by its items."""
+        return FrozenDictCls, (dict(self),)
+
+
+class AttrViewCls(object):
+    """This class provides a view on the slots of an instance that behaves like a dictionary."""
+    __slots__ = ('instance',)
+
+    def __init__(self, instance):
+        """Init class."""
+        self.instance = instance
+
+    def __getitem__(self, key):
+        """Get an attribute."""
+        try:
+            return getattr(self.instance, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        """Set an attribute."""
+        setattr(self.instance, key, value)
+
+    def __contains__(self, key):
+        """Check whether the attribute is set."""
+        return hasattr(self.instance, key)
+
+    def __iter__(self):
+        """Iterate over the attributes that are set."""
+        return iter(self.keys())
+
+    def __len__(self):
+        """Get the number of attributes that are set."""
+        return len(self.keys())
+
+    def keys(self):
+        """Get the labels of the attributes that are set."""
+        return [key_ for key_ in self.instance._get_labels() if hasattr(self.instance, key_)]
+
+    def values(self):
+        """Get the values of the attributes that are set."""
+        return [getattr(self.instance, key_) for key_ in self.keys()]
+
+    def items(self):
+        """Get the pairs of labels and values of the attributes that are set."""
+        return list(zip(self.keys(), self.values()))
+
+    def get(self, key, default=None):
+        """Get an attribute or the default if it is not set."""
+        return getattr(self.instance, key, default)
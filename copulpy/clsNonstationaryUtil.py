@@ -4,58 +4,88 @@ from functools import partial
 import numpy as np
 
 from copulpy.attribute_check.check_nonstationary import check_attributes_nonstationary
+from copulpy.clsPeriodFunction import get_discount_function
+from copulpy.clsPeriodFunction import y_weight_discounted
+from copulpy.clsPeriodFunction import PeriodFunctionCls
+from copulpy.clsPeriodTable import PeriodTableCls
 from copulpy.config_copulpy import HUGE_FLOAT
-from copulpy.clsMeta import MetaCls
+from copulpy.shared.backend import get_kernel
+from copulpy.clsMeta import SlotsMetaCls
 
 
-class NonstationaryUtilCls(MetaCls):
+class NonstationaryUtilCls(SlotsMetaCls):
     """Manage the nonstationary utility function."""
+    __slots__ = ('unrestricted_weights', 'y_scale', 'alpha', 'gamma', 'beta', 'discount_factors',
+                 'y_weights', '_check_attributes_nonstationary')
 
     def __init__(self, alpha, beta, gamma, discount_factors, y_scale,
                  unrestricted_weights=None, discounting=None):
         """Initialize nonstationary utility function."""
-        self.attr = dict()
-        self.attr['y_scale'] = y_scale
-        self.attr['alpha'] = alpha
-        self.attr['gamma'] = gamma
-        self.attr['beta'] = beta
+        self._assign_attributes(alpha, beta, gamma, y_scale, unrestricted_weights)
 
         if discounting is not None:
-            # Implement exponential discounting or hyperbolic discounting
+            # Implement exponential discounting or hyperbolic discounting, which is evaluated in
+            # closed form for arbitrary periods.
             np.testing.assert_equal(discounting in ['exponential', 'hyperbolic'], True)
-
-            if discounting in ['hyperbolic']:
-                df_beta = discount_factors[0]
-                df_delta = discount_factors[1]
-
-                new_dfx = {
-                    t: (df_beta * df_delta ** t if t > 0.0 else 1) for t in discount_factors.keys()
-                }
-            elif discounting in ['exponential']:
-                df_delta = discount_factors[0]
-                new_dfx = {t: (df_delta ** t if t > 0.0 else 1) for t in discount_factors.keys()}
-            self.attr['discount_factors'] = new_dfx
+            self.discount_factors = get_discount_function(discounting, discount_factors)
         else:
             # Implement nonparametric discounting.
-            self.attr['discount_factors'] = discount_factors
+            self.discount_factors = PeriodTableCls(discount_factors)
 
         # Optional argument: nonparametric weight on y_t in the CES function.
         if unrestricted_weights is None:
             # We apply the g() function here so that y_weights can be used identically below
-            df = self.attr['discount_factors']
-            y_weights = {t: y_scale * d_t ** (gamma - 1.0) for t, d_t in df.items()}
-            self.attr['y_weights'] = y_weights
+            df = self.discount_factors
+            if discounting is not None:
+                self.y_weights = self._get_y_weight_function()
+            else:
+                y_weights = {t: y_scale * d_t ** (gamma - 1.0) for t, d_t in df.items()}
+                self.y_weights = PeriodTableCls(y_weights)
         else:
             # Nonparametric weight: no g() function applied in this case.
-            self.attr['y_weights'] = unrestricted_weights
+            self.y_weights = PeriodTableCls(unrestricted_weights)
 
-        self._check_attributes_nonstationary = partial(check_attributes_nonstationary, self)
         self._check_attributes_nonstationary()
 
+    @classmethod
+    def restore(cls, alpha, beta, gamma, discount_factors, y_scale, unrestricted_weights,
+                y_weights=None):
+        """Restore the utility function from its tables or discount function without checks.
+
+        The weights on y are derived from the discount function if they are not tabulated.
+        """
+        util = cls.__new__(cls)
+        util._assign_attributes(alpha, beta, gamma, y_scale, unrestricted_weights)
+        util.discount_factors = discount_factors
+        if y_weights is None:
+            y_weights = util._get_y_weight_function()
+        util.y_weights = y_weights
+        return util
+
+    def _assign_attributes(self, alpha, beta, gamma, y_scale, unrestricted_weights):
+        """Assign the parameters of the utility function."""
+        self.unrestricted_weights = unrestricted_weights
+        self.y_scale = y_scale
+        self.alpha = alpha
+        self.gamma = gamma
+        self.beta = beta
+
+        self._check_attributes_nonstationary = partial(check_attributes_nonstationary, self)
+
+    def _get_y_weight_function(self):
+        """Get the weights on y that follow from the closed-form discount function."""
+        df = self.discount_factors
+        function = partial(y_weight_discounted, self.y_scale, self.gamma, df.get_attr('function'))
+        return PeriodFunctionCls(function, df.keys())
+
     def evaluate(self, x, y, t=0):
         """Evaluate the flow utility from consumption (x,y) in period t."""
+        # Arrays of bundles and periods are evaluated in a single vectorized pass.
+        if np.ndim(x) > 0 or np.ndim(y) > 0 or np.ndim(t) > 0:
+            return self._evaluate_array(x, y, t)
+
         alpha, beta, gamma, y_weights, discount_factors = \
-            self.get_attr('alpha', 'beta', 'gamma', 'y_weights', 'discount_factors')
+            self.alpha, self.beta, self.gamma, self.y_weights, self.discount_factors
         # Marginals: power utility
         v_1 = x ** beta
         v_2 = y ** (beta * gamma)
@@ -82,3 +112,193 @@ class NonstationaryUtilCls(MetaCls):
                     utils = HUGE_FLOAT
 
         return utils
+
+    def evaluator(self):
+        """Get a specialized function that evaluates the flow utility for a single bundle.
+
+        All parameters are bound as local variables and the period-specific parameters are looked
+        up directly. The function reflects the parameters at the time of its creation.
+        """
+        alpha, beta, gamma, y_weights, discount_factors = \
+            self.alpha, self.beta, self.gamma, self.y_weights, self.discount_factors
+
+        get_discount_factor, get_y_weight = discount_factors.get_lookup(), y_weights.get_lookup()
+        beta_gamma, exponent = beta * gamma, 1.0 / alpha
+
+        def evaluate(x, y, t=0):
+            """Evaluate the flow utility from consumption (x,y) in period t."""
+            # Case distinction to avoid overflow error
+            if x == 0.0:
+                if y == 0.0:
+                    return 0.0
+                return get_discount_factor(t) * get_y_weight(t) * y ** beta_gamma
+
+            if y == 0.0:
+                return get_discount_factor(t) * x ** beta
+
+            try:
+                utils = ((x ** beta) ** alpha + (get_y_weight(t) * y ** beta_gamma) ** alpha)
+                return get_discount_factor(t) * utils ** exponent
+            # Sometimes an overflow error occurs.
+            except ArithmeticError:
+                return HUGE_FLOAT
+
+        return evaluate
+
+    def evaluate_grid(self, x, y, t=0, **params):
+        """Evaluate the flow utility for a whole grid of parameters at once.
+
+        Any of alpha, beta, gamma and y_scale can be passed as arrays, which broadcast against each
+        other. The result has the shape of the parameters followed by the shape of the data.
+        """
+        args = self._get_grid_arguments(x, y, t, params)[:-1]
+        return nonstationary_kernel(*args)
+
+    def evaluate_gradient(self, x, y, t=0, **params):
+        """Evaluate the flow utility together with its gradient with respect to all parameters.
+
+        The parameters can be replaced just as for evaluate_grid. The gradient is a dictionary with
+        the derivatives with respect to alpha, beta, gamma, and y_scale as well as the discount
+        factors and, if specified, the unrestricted weights. The derivatives for the last two are
+        stacked along a trailing axis in the order of their periods or parameters.
+        """
+        x, y, alpha, beta, gamma, discount_factor, y_weight, t = \
+            self._get_grid_arguments(x, y, t, params)
+
+        y_weights, discount_factors, unrestricted_weights = \
+            self.y_weights, self.discount_factors, self.unrestricted_weights
+
+        utils = nonstationary_kernel(x, y, alpha, beta, gamma, discount_factor, y_weight)
+
+        # The weight on y depends on the discount factor and gamma unless it is unrestricted.
+        is_restricted = unrestricted_weights is None
+        grad_alpha, grad_beta, grad_gamma, grad_weight, grad_discount = nonstationary_gradient(
+            x, y, alpha, beta, gamma, discount_factor, y_weight, utils, is_restricted)
+
+        grad = dict()
+        grad['alpha'] = grad_alpha
+        grad['beta'] = grad_beta
+        grad['gamma'] = grad_gamma
+        if is_restricted:
+            grad['y_scale'] = grad_weight * discount_factor ** (gamma - 1.0)
+        else:
+            grad['y_scale'] = np.zeros_like(utils)
+            grad['unrestricted_weights'] = grad_weight[..., None] * y_weights.get_gradient(t)
+        grad['discount_factors'] = grad_discount[..., None] * discount_factors.get_gradient(t)
+
+        return utils, grad
+
+    def _get_grid_arguments(self, x, y, t, params):
+        """Get the arguments of the kernel, where the parameters are aligned with the data."""
+        labels = ['alpha', 'beta', 'gamma', 'y_scale']
+        np.testing.assert_equal(set(params.keys()).issubset(labels), True)
+
+        alpha, beta, gamma, y_scale = np.broadcast_arrays(
+            *[np.asarray(params.get(label, getattr(self, label)), dtype=float) for label in labels])
+
+        y_weights, discount_factors, unrestricted_weights = \
+            self.y_weights, self.discount_factors, self.unrestricted_weights
+
+        x, y, t = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float), t)
+        discount_factor = discount_factors[t]
+
+        # The parameters are aligned along the leading axes and the data along the trailing axes.
+        shape = alpha.shape + (1,) * x.ndim
+        alpha, beta, gamma, y_scale = [
+            var.reshape(shape) for var in [alpha, beta, gamma, y_scale]]
+
+        if unrestricted_weights is None:
+            y_weight = y_scale * discount_factor ** (gamma - 1.0)
+        else:
+            y_weight = y_weights[t]
+
+        return x, y, alpha, beta, gamma, discount_factor, y_weight, t
+
+    def _evaluate_array(self, x, y, t):
+        """Evaluate the flow utility elementwise for arrays of bundles and periods."""
+        alpha, beta, gamma, y_weights, discount_factors = \
+            self.alpha, self.beta, self.gamma, self.y_weights, self.discount_factors
+
+        x, y, t = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float), t)
+        discount_factor, y_weight = discount_factors[t], y_weights[t]
+
+        # The kernel of the active backend evaluates all elements in a single pass.
+        kernel = get_kernel(nonstationary_kernel)
+        return kernel(x, y, alpha, beta, gamma, discount_factor, y_weight)
+
+
+def nonstationary_kernel(x, y, alpha, beta, gamma, discount_factor, y_weight):
+    """Evaluate the nonstationary utility elementwise, where all arguments broadcast."""
+    # The case distinction of the scalar evaluation is replaced by masks and the overflow error by
+    # a check for values that are not finite.
+    with np.errstate(over='ignore', invalid='ignore'):
+        # Marginals: power utility
+        v_1 = x ** beta
+        v_2 = y ** (beta * gamma)
+
+        utils = ((v_1 ** alpha) + ((y_weight * v_2) ** alpha)) ** (1.0 / alpha)
+        utils = discount_factor * utils
+
+        is_zero_x, is_zero_y = (x == 0.0), (y == 0.0)
+
+        utils = np.where(is_zero_x, discount_factor * y_weight * v_2, utils)
+        utils = np.where(is_zero_y, discount_factor * v_1, utils)
+        utils = np.where(is_zero_x & is_zero_y, 0.0, utils)
+
+    # The overflow is only mapped once all cases are combined, as it may occur in any of them.
+    return np.where(np.isfinite(utils), utils, HUGE_FLOAT)
+
+
+def nonstationary_gradient(x, y, alpha, beta, gamma, discount_factor, y_weight, utils,
+                           is_restricted):
+    """Evaluate the derivatives of the nonstationary utility elementwise.
+
+    The derivatives are with respect to alpha, beta, gamma, the weight on y, and the discount
+    factor. If the weight is restricted, it is a function of the discount factor and gamma.
+    """
+    with np.errstate(all='ignore'):
+        log_x, log_y = np.log(x), np.log(y)
+        log_weight = np.log(y_weight)
+
+        # The derivative of the log weight on y with respect to gamma.
+        grad_log_weight = np.log(discount_factor) if is_restricted else 0.0
+
+        # Both positive
+        a = (x ** beta) ** alpha
+        b = (y_weight * y ** (beta * gamma)) ** alpha
+        share = b / (a + b)
+
+        grad_alpha = -np.log(a + b) / alpha ** 2
+        grad_alpha += (a * beta * log_x + b * (log_weight + beta * gamma * log_y)) / \
+            (alpha * (a + b))
+        grad_alpha *= utils
+        grad_beta = utils * (a * log_x + b * gamma * log_y) / (a + b)
+        grad_gamma = utils * share * (beta * log_y + grad_log_weight)
+        grad_weight = utils * share / y_weight
+        grad_discount = utils / discount_factor
+        if is_restricted:
+            grad_discount *= 1.0 + share * (gamma - 1.0)
+
+        # Only y positive, which corresponds to a share of one.
+        is_zero_x = (x == 0.0)
+        grad_alpha = np.where(is_zero_x, 0.0, grad_alpha)
+        grad_beta = np.where(is_zero_x, utils * gamma * log_y, grad_beta)
+        grad_gamma = np.where(is_zero_x, utils * (beta * log_y + grad_log_weight), grad_gamma)
+        grad_weight = np.where(is_zero_x, utils / y_weight, grad_weight)
+        if is_restricted:
+            grad_discount = np.where(is_zero_x, utils * gamma / discount_factor, grad_discount)
+
+        # Only x positive, which corresponds to a share of zero.
+        is_zero_y = (y == 0.0)
+        grad_alpha = np.where(is_zero_y, 0.0, grad_alpha)
+        grad_beta = np.where(is_zero_y, utils * log_x, grad_beta)
+        grad_gamma = np.where(is_zero_y, 0.0, grad_gamma)
+        grad_weight = np.where(is_zero_y, 0.0, grad_weight)
+        grad_discount = np.where(is_zero_y, utils / discount_factor, grad_discount)
+
+        # The utility is constant if both are zero or it overflows.
+        is_constant = (is_zero_x & is_zero_y) | (utils == HUGE_FLOAT)
+        grads = [grad_alpha, grad_beta, grad_gamma, grad_weight, grad_discount]
+        grads = [np.where(is_constant, 0.0, grad) for grad in grads]
+
+    return grads
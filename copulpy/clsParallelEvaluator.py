@@ -0,0 +1,195 @@
+"""This module houses the class for the parallel evaluation of many copulas in a process pool."""
+import multiprocessing as mp
+import os
+
+import numpy as np
+
+from copulpy.shared.validation import get_validation_mode
+from copulpy.shared.validation import set_validation_mode
+from copulpy.clsUtilityCopula import UtilityCopulaCls
+from copulpy.shared.auxiliary import get_periods
+from copulpy.shared.backend import get_backend
+from copulpy.shared.backend import set_backend
+from copulpy.clsMeta import MetaCls
+
+
+class ParallelEvaluatorCls(MetaCls):
+    """This class evaluates a population of differently parameterized copulas in a process pool.
+
+    The workers receive the specifications of all copulas once, when the pool is started, and
+    construct each copula at most once. For each request, the bundles and the results are
+    exchanged through shared memory, so the tasks themselves only consist of a few indices. The
+    pool is started on the first request and remains available until the evaluator is closed. As
+    the workers are spawned, scripts need the usual if __name__ == '__main__' guard. The shared
+    memory requires Python 3.8 or later.
+    """
+
+    def __init__(self, copula_specs, num_workers=None):
+        """Init class."""
+        self.attr = dict()
+        self.attr['num_workers'] = num_workers or os.cpu_count()
+        self.attr['copula_specs'] = list(copula_specs)
+        self.attr['pool'] = None
+
+    def evaluate(self, x, y, t=0, is_normalized=False, subject_idx=None):
+        """Evaluate the copulas for arrays of bundles and periods.
+
+        Without subject indices, all copulas are evaluated for all bundles and the result has the
+        number of copulas as its leading axis. Otherwise, each bundle is evaluated only for the
+        copula of its subject and the result has the shape of the bundles.
+        """
+        copula_specs = self.attr['copula_specs']
+
+        x, y, t = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float), t)
+        shape = x.shape
+
+        data = dict()
+        data['x'], data['y'] = x.reshape(-1), y.reshape(-1)
+        # Periods that are not integral raise a KeyError just like for the copulas themselves.
+        data['t'] = get_periods(t.reshape(-1))
+
+        if subject_idx is None:
+            data['rslt'] = np.empty((len(copula_specs), x.size))
+            tasks = [(i, None, None) for i in range(len(copula_specs))]
+        else:
+            subject_idx = np.broadcast_to(subject_idx, shape).reshape(-1)
+            np.testing.assert_equal(np.all(subject_idx < len(copula_specs)), True)
+
+            # The bundles are grouped by subject and each group is evaluated in a single task.
+            data['order'] = np.argsort(subject_idx, kind='stable')
+            data['rslt'] = np.empty(x.size)
+
+            subjects, starts = np.unique(subject_idx[data['order']], return_index=True)
+            stops = np.append(starts[1:], x.size)
+            tasks = list(zip(subjects.tolist(), starts.tolist(), stops.tolist()))
+
+        blocks = dict()
+        try:
+            for label, array in data.items():
+                blocks[label] = _share_array(array)
+
+            info = {label: (block.name, data[label].shape, data[label].dtype.str)
+                    for label, block in blocks.items()}
+            tasks = [(info, is_normalized) + task for task in tasks]
+
+            chunksize = max(1, len(tasks) // (4 * self.attr['num_workers']))
+            self._get_pool().map(_evaluate_task, tasks, chunksize)
+
+            rslt = _get_view(blocks['rslt'], data['rslt'].shape, data['rslt'].dtype).copy()
+        finally:
+            for block in blocks.values():
+                block.close()
+                block.unlink()
+
+        if subject_idx is None:
+            return rslt.reshape((len(copula_specs),) + shape)
+
+        return rslt.reshape(shape)
+
+    def close(self):
+        """Shut down the process pool."""
+        if self.attr['pool'] is not None:
+            self.attr['pool'].terminate()
+            self.attr['pool'].join()
+            self.attr['pool'] = None
+
+    def __enter__(self):
+        """Enter the context of the evaluator."""
+        return self
+
+    def __exit__(self, *args):
+        """Shut down the process pool when leaving the context of the evaluator."""
+        self.close()
+
+    def _get_pool(self):
+        """Get the process pool, which is started on first use."""
+        if self.attr['pool'] is None:
+            # The workers inherit the current validation mode and backend. They are spawned as
+            # forking is unsafe once the compiled kernels have started their threads.
+            initargs = self.attr['copula_specs'], get_validation_mode(), get_backend()
+            self.attr['pool'] = mp.get_context('spawn').Pool(
+                self.attr['num_workers'], initializer=_initialize_worker, initargs=initargs)
+
+        return self.attr['pool']
+
+
+def _share_array(array):
+    """Copy an array into a new block of shared memory."""
+    # The module is only available as of Python 3.8, so it is imported on first use.
+    from multiprocessing import shared_memory
+
+    block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    _get_view(block, array.shape, array.dtype)[...] = array
+    return block
+
+
+def _get_view(block, shape, dtype):
+    """Get an array that is backed by a block of shared memory."""
+    return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _initialize_worker(copula_specs, validation_mode, backend):
+    """Initialize the state of a worker process."""
+    set_validation_mode(validation_mode)
+    set_backend(backend)
+
+    # The workers already run in parallel, so each runs the compiled kernels on a single thread.
+    if backend in ['numba']:
+        import numba
+        numba.set_num_threads(1)
+
+    _WORKER['copula_specs'] = copula_specs
+    _WORKER['copulas'] = dict()
+    _WORKER['blocks'] = dict()
+
+
+def _attach_arrays(info):
+    """Attach to the shared arrays of a request, which are reused for all of its tasks."""
+    from multiprocessing import shared_memory
+
+    names = tuple(sorted(name for name, _, _ in info.values()))
+
+    if _WORKER['blocks'].get('names') != names:
+        for block in _WORKER['blocks'].get('handles', []):
+            block.close()
+
+        handles, arrays = [], dict()
+        for label, (name, shape, dtype) in info.items():
+            block = shared_memory.SharedMemory(name=name)
+            handles += [block]
+            arrays[label] = _get_view(block, shape, np.dtype(dtype))
+
+        _WORKER['blocks'] = {'names': names, 'handles': handles, 'arrays': arrays}
+
+    return _WORKER['blocks']['arrays']
+
+
+def _get_copula(subject):
+    """Get the copula of a subject, which is constructed once per worker."""
+    if subject not in _WORKER['copulas']:
+        _WORKER['copulas'][subject] = UtilityCopulaCls(_WORKER['copula_specs'][subject])
+
+    return _WORKER['copulas'][subject]
+
+
+def _evaluate_task(task):
+    """Evaluate a single copula for all its bundles and write the results to shared memory."""
+    info, is_normalized, subject, start, stop = task
+
+    arrays = _attach_arrays(info)
+    copula = _get_copula(subject)
+
+    if start is None:
+        rows = slice(None)
+        rslt = arrays['rslt'][subject]
+    else:
+        rows = arrays['order'][start:stop]
+        rslt = arrays['rslt']
+
+    # The scaled Archimedean copula does not depend on the period.
+    t = arrays['t'][rows] if copula.version in ['nonstationary', 'warmglow'] else 0
+
+    rslt[rows] = copula.evaluate(arrays['x'][rows], arrays['y'][rows], t, is_normalized)
+
+
+_WORKER = dict()
@@ -0,0 +1,140 @@
+"""This module houses the class for period-specific parameters in closed form."""
+from functools import lru_cache
+from functools import partial
+
+import numpy as np
+
+from copulpy.config_copulpy import PERIOD_CACHE_SIZE
+from copulpy.clsMeta import MetaCls
+
+
+class PeriodFunctionCls(MetaCls):
+    """This class evaluates period-specific parameters from a closed-form function of the period.
+
+    The values are computed on demand for arbitrary periods, either for a single period or for a
+    whole array of periods at once. Single periods are memoized in a bounded cache. For
+    compatibility with the period tables, the class supports the read-only parts of the dictionary
+    interface for the periods of the original specification.
+    """
+
+    def __init__(self, function, periods, gradient=None):
+        """Init class."""
+        self.attr = dict()
+        self.attr['periods'] = sorted(periods)
+        self.attr['gradient'] = gradient
+        self.attr['function'] = function
+
+        self._get_value = lru_cache(maxsize=PERIOD_CACHE_SIZE)(function)
+
+    def __getitem__(self, t):
+        """Evaluate the function for a single period or an array of periods."""
+        if np.ndim(t) == 0:
+            return self._get_value(t)
+
+        return self.attr['function'](np.asarray(t))
+
+    def get_lookup(self):
+        """Get a plain function that evaluates the value of a single period."""
+        return self._get_value
+
+    def get_gradient(self, t):
+        """Get the derivatives of the values for the periods with respect to the parameters.
+
+        The derivatives are stacked along a trailing axis.
+        """
+        return self.attr['gradient'](np.asarray(t))
+
+    def __contains__(self, t):
+        """Check whether there is a value for the period."""
+        return t >= 0
+
+    def __iter__(self):
+        """Iterate over the periods."""
+        return iter(self.keys())
+
+    def __len__(self):
+        """Get the number of periods."""
+        return len(self.attr['periods'])
+
+    def __getstate__(self):
+        """Get the state for pickling, which excludes the memoized values."""
+        return self.attr
+
+    def __setstate__(self, attr):
+        """Set the state after unpickling."""
+        self.__init__(attr['function'], attr['periods'], attr['gradient'])
+
+    def keys(self):
+        """Get the periods."""
+        return list(self.attr['periods'])
+
+    def values(self):
+        """Get the values."""
+        return [self[t] for t in self.keys()]
+
+    def items(self):
+        """Get the pairs of periods and values."""
+        return list(zip(self.keys(), self.values()))
+
+
+def get_discount_function(discounting, discount_factors):
+    """Construct the closed-form discount function from its parameters."""
+    if discounting in ['hyperbolic']:
+        params = discount_factors[0], discount_factors[1]
+        function = partial(discount_hyperbolic, *params)
+        gradient = partial(discount_hyperbolic_gradient, *params)
+    elif discounting in ['exponential']:
+        params = discount_factors[0],
+        function = partial(discount_exponential, *params)
+        gradient = partial(discount_exponential_gradient, *params)
+    else:
+        raise NotImplementedError
+
+    return PeriodFunctionCls(function, discount_factors.keys(), gradient)
+
+
+def discount_hyperbolic(df_beta, df_delta, t):
+    """Evaluate the quasi-hyperbolic discount function."""
+    if np.ndim(t) == 0:
+        return df_beta * df_delta ** t if t > 0.0 else 1
+
+    return np.where(t > 0.0, df_beta * df_delta ** t, 1.0)
+
+
+def discount_exponential(df_delta, t):
+    """Evaluate the exponential discount function."""
+    if np.ndim(t) == 0:
+        return df_delta ** t if t > 0.0 else 1
+
+    return np.where(t > 0.0, df_delta ** t, 1.0)
+
+
+def discount_hyperbolic_gradient(df_beta, df_delta, t):
+    """Evaluate the derivatives of the quasi-hyperbolic discount function."""
+    is_future = t > 0.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        grad_beta = np.where(is_future, df_delta ** t, 0.0)
+        grad_delta = np.where(is_future, df_beta * t * df_delta ** (t - 1.0), 0.0)
+
+    return np.stack((grad_beta, grad_delta), axis=-1)
+
+
+def discount_exponential_gradient(df_delta, t):
+    """Evaluate the derivatives of the exponential discount function."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        grad_delta = np.where(t > 0.0, t * df_delta ** (t - 1.0), 0.0)
+
+    return grad_delta[..., None]
+
+
+def y_weight_discounted(y_scale, gamma, discount_function, t):
+    """Evaluate the weight on y that follows from the discount function."""
+    return y_scale * discount_function(t) ** (gamma - 1.0)
+
+
+def y_weight_constant(y_scale, t):
+    """Evaluate the constant weight on y."""
+    if np.ndim(t) == 0:
+        return y_scale
+
+    return np.tile(float(y_scale), np.shape(t))
@@ -0,0 +1,111 @@
+"""This module houses the class for the tables of period-specific parameters."""
+from numbers import Integral
+
+import numpy as np
+
+from copulpy.shared.auxiliary import get_periods
+from copulpy.clsMeta import MetaCls
+
+
+class PeriodTableCls(MetaCls):
+    """This class stores period-specific parameters in contiguous arrays.
+
+    The values are accessed through a dense map from the periods to their position, so that they
+    can be looked up for a whole array of periods at once. For compatibility, the class supports the
+    read-only parts of the dictionary interface.
+    """
+
+    def __init__(self, table):
+        """Init class."""
+        keys = sorted(table.keys())
+
+        # Periods must be integral, which includes floats with integral values.
+        periods = np.array(keys, dtype=int)
+        np.testing.assert_equal(periods, keys)
+        np.testing.assert_equal(np.all(periods >= 0), True)
+
+        values = np.array([table[t] for t in periods.tolist()], dtype=float)
+
+        self._set_arrays(periods, values)
+
+    @classmethod
+    def from_arrays(cls, periods, values):
+        """Construct the table directly from the sorted periods and their values."""
+        table = cls.__new__(cls)
+        table._set_arrays(periods, values)
+        return table
+
+    def _set_arrays(self, periods, values):
+        """Set the values and the dense map from the periods to their position."""
+        index = np.tile(-1, periods[-1] + 1 if periods.size > 0 else 0)
+        index[periods] = np.arange(periods.size)
+
+        self.attr = dict()
+        self.attr['values'] = values
+        self.attr['periods'] = periods
+        self.attr['index'] = index
+
+    def __getitem__(self, t):
+        """Look up the values for a single period or an array of periods.
+
+        Floats with integral values are accepted as periods, just like for a dictionary.
+        """
+        values, index = self.attr['values'], self.attr['index']
+
+        # A single period is handled separately and returns a Python float just like a dictionary.
+        if np.ndim(t) == 0:
+            if not isinstance(t, Integral):
+                t = get_periods(t).item()
+            pos = index[t] if 0 <= t < index.size else -1
+            if pos < 0:
+                raise KeyError(t)
+            return values.item(pos)
+
+        t = get_periods(t)
+        if t.size > 0 and (np.min(t) < 0 or np.max(t) >= index.size):
+            raise KeyError(t)
+
+        pos = index[t]
+        if np.any(pos < 0):
+            raise KeyError(t)
+
+        return values[pos]
+
+    def get_lookup(self):
+        """Get a plain function that looks up the value of a single period."""
+        return dict(self.items()).__getitem__
+
+    def get_gradient(self, t):
+        """Get the derivatives of the values for the periods with respect to all table entries.
+
+        The derivatives are indicators for the period and stacked along a trailing axis.
+        """
+        return np.equal.outer(np.asarray(t), self.attr['periods']).astype(float)
+
+    def __contains__(self, t):
+        """Check whether there is a value for the period."""
+        try:
+            self[t]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        """Iterate over the periods."""
+        return iter(self.keys())
+
+    def __len__(self):
+        """Get the number of periods."""
+        return self.attr['periods'].size
+
+    def keys(self):
+        """Get the periods."""
+        return self.attr['periods'].tolist()
+
+    def values(self):
+        """Get the values."""
+        return self.attr['values'].tolist()
+
+    def items(self):
+        """Get the pairs of periods and values."""
+        return list(zip(self.keys(), self.values()))
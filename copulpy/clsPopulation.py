@@ -0,0 +1,200 @@
+"""This module houses the class for a population of nonstationary and warm glow utilities."""
+import numpy as np
+
+from copulpy.clsNonstationaryUtil import nonstationary_kernel
+from copulpy.shared.validation import get_validation_mode
+from copulpy.shared.auxiliary import distribute_copula_spec
+from copulpy.clsPeriodFunction import discount_exponential
+from copulpy.clsPeriodFunction import discount_hyperbolic
+from copulpy.clsWarmglowUtil import warmglow_kernel
+from copulpy.shared.validation import assert_range
+from copulpy.shared.auxiliary import get_periods
+from copulpy.clsMeta import MetaCls
+
+
+class PopulationCls(MetaCls):
+    """This class manages the utility functions of a whole population of subjects.
+
+    The parameters of the N subjects are stored in arrays of length N instead of one copula per
+    subject. Nonparametric discount factors and unrestricted weights are stored in dense tables
+    with one row per subject and one column per period, where missing periods are NaN. Parametric
+    discounting is evaluated in closed form for arbitrary periods. Subjects can mix the
+    nonstationary and the warm glow version.
+    """
+
+    def __init__(self, copula_specs):
+        """Init class."""
+        num_subjects = len(copula_specs)
+
+        labels = ['alpha', 'beta', 'gamma', 'y_scale']
+        params = {label: np.tile(np.nan, num_subjects) for label in labels}
+
+        is_warmglow = np.tile(False, num_subjects)
+        is_linear = np.tile(False, num_subjects)
+        is_parametric = np.tile(False, num_subjects)
+        is_hyperbolic = np.tile(False, num_subjects)
+        is_unrestricted = np.tile(False, num_subjects)
+
+        # The parameters of the discount functions, where df_beta is one for exponential
+        # discounting.
+        df_params = np.tile(np.nan, (num_subjects, 2))
+
+        tables = []
+        for i, copula_spec in enumerate(copula_specs):
+            version = copula_spec['version']
+            np.testing.assert_equal(version in ['nonstationary', 'warmglow'], True)
+
+            for label in labels:
+                params[label][i] = distribute_copula_spec(copula_spec, label)
+
+            discount_factors, unrestricted_weights, discounting = distribute_copula_spec(
+                copula_spec, 'discount_factors', 'unrestricted_weights', 'discounting')
+
+            if version in ['warmglow']:
+                warmglow_type = distribute_copula_spec(copula_spec, 'warmglow_type')
+                np.testing.assert_equal(warmglow_type in ['constant', 'linear'], True)
+                is_linear[i] = warmglow_type in ['linear']
+                is_warmglow[i] = True
+
+            if discounting is None:
+                tables += [(discount_factors, unrestricted_weights)]
+            else:
+                np.testing.assert_equal(discounting in ['exponential', 'hyperbolic'], True)
+                if discounting in ['hyperbolic']:
+                    df_params[i] = discount_factors[0], discount_factors[1]
+                    is_hyperbolic[i] = True
+                else:
+                    df_params[i] = 1.0, discount_factors[0]
+                tables += [(dict(), unrestricted_weights)]
+                is_parametric[i] = True
+
+            is_unrestricted[i] = unrestricted_weights is not None
+
+        num_periods = 1 + max([max(list(d.keys()) + list((w or {}).keys()) + [0])
+                               for d, w in tables] + [0])
+
+        discount_table = np.tile(np.nan, (num_subjects, num_periods))
+        weight_table = np.tile(np.nan, (num_subjects, num_periods))
+        for i, (discount_factors, unrestricted_weights) in enumerate(tables):
+            for t, value in discount_factors.items():
+                discount_table[i, t] = value
+            for t, value in (unrestricted_weights or {}).items():
+                weight_table[i, t] = value
+
+        self.attr = dict()
+        self.attr['num_subjects'] = num_subjects
+        self.attr.update(params)
+        self.attr['is_warmglow'] = is_warmglow
+        self.attr['is_linear'] = is_linear
+        self.attr['is_parametric'] = is_parametric
+        self.attr['is_hyperbolic'] = is_hyperbolic
+        self.attr['is_unrestricted'] = is_unrestricted
+        self.attr['df_params'] = df_params
+        self.attr['discount_table'] = discount_table
+        self.attr['weight_table'] = weight_table
+
+    def evaluate(self, subject_idx, x, y, t=0):
+        """Evaluate the flow utility of each bundle for the utility function of its subject.
+
+        All arguments broadcast against each other and the result has their shape.
+        """
+        subject_idx, x, y, t = np.broadcast_arrays(
+            subject_idx, np.asarray(x, dtype=float), np.asarray(y, dtype=float), get_periods(t))
+
+        # Negative indices would silently select other subjects, so the range is always checked.
+        num_subjects = self.attr['num_subjects']
+        if subject_idx.size > 0 and not (0 <= np.min(subject_idx) <= np.max(subject_idx)
+                                         < num_subjects):
+            raise IndexError('... subject indices must be in [0, {})'.format(num_subjects))
+
+        # Check integrity of request
+        self._additional_checks('evaluate_in', subject_idx, x, y, t)
+
+        alpha, beta, gamma, y_scale = [self.attr[label][subject_idx] for label in
+                                       ['alpha', 'beta', 'gamma', 'y_scale']]
+        is_warmglow = self.attr['is_warmglow'][subject_idx]
+        is_linear = self.attr['is_linear'][subject_idx]
+
+        discount_factor = self._get_discount_factors(subject_idx, t)
+
+        # The restricted weights on y follow from the discount factors in the nonstationary
+        # version and are constant in the warm glow version.
+        y_weight = np.where(is_warmglow, y_scale, y_scale * discount_factor ** (gamma - 1.0))
+        is_unrestricted = self.attr['is_unrestricted'][subject_idx]
+        if np.any(is_unrestricted):
+            weights = self._look_up(self.attr['weight_table'], subject_idx, t, is_unrestricted)
+            y_weight = np.where(is_unrestricted, weights, y_weight)
+
+        args = [x, y, alpha, beta, gamma, discount_factor, y_weight]
+
+        # Each version of the utility function is evaluated for all of its subjects at once.
+        rslt = np.empty(x.shape)
+        for is_subset, warmglow_type in [(~is_warmglow, None),
+                                         (is_warmglow & ~is_linear, 'constant'),
+                                         (is_warmglow & is_linear, 'linear')]:
+            if not np.any(is_subset):
+                continue
+            subset = [arg[is_subset] for arg in args]
+            if warmglow_type is None:
+                rslt[is_subset] = nonstationary_kernel(*subset)
+            else:
+                rslt[is_subset] = warmglow_kernel(*subset, warmglow_type)
+
+        # Check return value
+        self._additional_checks('evaluate_out', rslt)
+
+        return rslt
+
+    def _get_discount_factors(self, subject_idx, t):
+        """Get the discount factors of the subjects in the periods."""
+        is_parametric = self.attr['is_parametric'][subject_idx]
+
+        discount_factor = np.tile(np.nan, subject_idx.shape)
+        if np.any(~is_parametric):
+            discount_factor = self._look_up(
+                self.attr['discount_table'], subject_idx, t, ~is_parametric)
+
+        if np.any(is_parametric):
+            is_hyperbolic = self.attr['is_hyperbolic'][subject_idx]
+            df_beta, df_delta = self.attr['df_params'][subject_idx].T
+
+            # The discount functions are shared with the individual copulas.
+            with np.errstate(invalid='ignore'):
+                is_subset = is_parametric & is_hyperbolic
+                discount_factor[is_subset] = discount_hyperbolic(
+                    df_beta[is_subset], df_delta[is_subset], t[is_subset])
+                is_subset = is_parametric & ~is_hyperbolic
+                discount_factor[is_subset] = discount_exponential(df_delta[is_subset], t[is_subset])
+
+        return discount_factor
+
+    @staticmethod
+    def _look_up(table, subject_idx, t, is_relevant):
+        """Look up the values of the subjects in the periods, which must exist where relevant."""
+        is_valid = (0 <= t) & (t < table.shape[1])
+        rslt = np.where(is_valid, table[subject_idx, np.where(is_valid, t, 0)], np.nan)
+
+        if np.any(is_relevant & np.isnan(rslt)):
+            raise KeyError(np.unique(t[is_relevant & np.isnan(rslt)]))
+
+        return rslt
+
+    def _additional_checks(self, label, *args):
+        """Perform some additional checks on selected features of the class instance."""
+        # We only run these tests during debugging as otherwise the performance deteriorates.
+        mode = get_validation_mode()
+        if mode in ['off']:
+            return
+
+        if label in ['evaluate_in']:
+            subject_idx, x, y, t = args
+            np.testing.assert_equal(np.issubdtype(subject_idx.dtype, np.integer), True)
+            if subject_idx.size > 0:
+                assert_range(x, 0.0)
+                assert_range(y, 0.0)
+        elif label in ['evaluate_out']:
+            rslt, = args
+            if rslt.size > 0:
+                assert_range(rslt)
+        else:
+            raise NotImplementedError
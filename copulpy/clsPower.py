@@ -1,48 +1,76 @@
 """This module houses the class for the power utility function."""
+from functools import partial
 from numbers import Number
 import numpy as np
 
-from copulpy.config_copulpy import IS_DEBUG
-from copulpy.clsMeta import MetaCls
+from copulpy.shared.validation import get_validation_mode
+from copulpy.shared.validation import assert_range
+from copulpy.shared.backend import get_kernel
+from copulpy.clsMeta import derived_input
+from copulpy.clsMeta import SlotsMetaCls
 
 
-class PowerCls(MetaCls):
+class PowerCls(SlotsMetaCls):
     """This class manages the uniattribute utility function."""
+    __slots__ = ('_upper_bound', '_r', 'a', 'b', 'normalization')
+
+    upper_bound = derived_input('upper_bound')
+    r = derived_input('r')
 
     def __init__(self, r, a=1, b=0, upper_bound=None):
         """Init class."""
-        self.attr = dict()
-        self.attr['upper_bound'] = upper_bound
-        self.attr['r'] = r
-        self.attr['a'] = a
-        self.attr['b'] = b
+        self._assign_attributes(r, a, b, upper_bound)
 
-        self._check_attributes()
+        self._derive_attributes()
+
+    @classmethod
+    def restore(cls, r, a, b, upper_bound, normalization):
+        """Restore the utility function with its precomputed normalization and without checks."""
+        marginal = cls.__new__(cls)
+        marginal._assign_attributes(r, a, b, upper_bound)
+        marginal.normalization = tuple(normalization)
+        return marginal
+
+    def _assign_attributes(self, r, a, b, upper_bound):
+        """Assign the parameters of the utility function."""
+        self._upper_bound = upper_bound
+        self._r = r
+        self.a = a
+        self.b = b
 
     def evaluate(self, x, is_normalized=False):
         """Evaluate the specified power utility function."""
-        # Check integrity of request and class instance.
+        # Check integrity of request.
         self._additional_checks('evaluate_in', x)
-        self._check_attributes()
 
-        # Distribute class attribute
-        upper_bound = self.get_attr('upper_bound')
-
-        if is_normalized:
-            np.testing.assert_equal(upper_bound is None, False)
-            numerator = self._power_utility(x) - self._power_utility(0)
-            denominator = self._power_utility(upper_bound) - self._power_utility(0)
-            u = numerator / denominator
-        else:
-            u = self._power_utility(x)
+        u = self._evaluate(x, is_normalized)
 
         self._additional_checks('evaluate_out', u)
 
         return u
 
+    def _evaluate(self, x, is_normalized):
+        """Evaluate the power utility function without any checks."""
+        if is_normalized:
+            # The normalization is precomputed, see _derive_attributes.
+            r, denominator = self.normalization
+            if np.ndim(x) > 0:
+                return get_kernel(power_kernel)(x, r, denominator)
+            return power_kernel(x, r, denominator)
+
+        return self._power_utility(x)
+
+    def evaluator(self, is_normalized=False):
+        """Get a specialized function that evaluates the utility, where all parameters are bound."""
+        if is_normalized:
+            r, denominator = self.normalization
+            return partial(power_kernel, r=r, denominator=denominator)
+
+        return self._power_utility
+
     def _power_utility(self, x):
         """Evaluate power utility."""
-        r, a, b = self.get_attr('r', 'a', 'b')
+        r, a, b = self.r, self.a, self.b
 
         if r > 0:
             rslt = a * (x ** r) + b
@@ -51,9 +79,19 @@ class PowerCls(MetaCls):
 
         return rslt
 
+    def _derive_attributes(self):
+        """Check the attributes and precompute the normalization of the utility function."""
+        self._check_attributes()
+
+        r, upper_bound = self.r, self.upper_bound
+
+        # The linear transformation cancels in the normalized utility, which is thus the ratio of
+        # x ** r and upper_bound ** r.
+        self.normalization = r, upper_bound ** r
+
     def _check_attributes(self):
         """Check the attributes of the class."""
-        r, a, b, upper_bound = self.get_attr('r', 'a', 'b', 'upper_bound')
+        r, a, b, upper_bound = self.r, self.a, self.b, self.upper_bound
 
         for var in [r, a, b, upper_bound]:
             np.testing.assert_equal(isinstance(var, Number), True)
@@ -67,11 +105,22 @@ class PowerCls(MetaCls):
     def _additional_checks(self, label, *args):
         """Perform some additional checks on selected features of the class instance."""
         # We only run these tests during debugging as otherwise the performance deteriorates.
-        if not IS_DEBUG:
+        mode = get_validation_mode()
+        if mode in ['off']:
+            return
+
+        # In the batch mode, the request and the return value are validated in a single pass each.
+        if mode in ['batch']:
+            if label in ['evaluate_in']:
+                x, = args
+                assert_range(x, 0.0, self.upper_bound)
+            elif label in ['evaluate_out']:
+                u = args[0]
+                assert_range(u)
             return
 
         # Distribute class attributes
-        upper_bound = self.get_attr('upper_bound')
+        upper_bound = self.upper_bound
 
         if label in ["evaluate_out"]:
             u, = args
@@ -82,3 +131,8 @@ class PowerCls(MetaCls):
             np.testing.assert_equal(x <= upper_bound, True)
         else:
             raise NotImplementedError
+
+
+def power_kernel(x, r, denominator):
+    """Evaluate the normalized power utility elementwise."""
+    return x ** r / denominator
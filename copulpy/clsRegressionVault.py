@@ -0,0 +1,125 @@
+"""This module houses the class for the regression vault in a columnar format."""
+import os
+
+import numpy as np
+
+from copulpy.clsCopulaArchive import CopulaArchiveCls
+from copulpy.clsUtilityCopula import UtilityCopulaCls
+from copulpy.clsCopulaCache import get_canonical
+from copulpy.clsMeta import MetaCls
+
+
+class RegressionVaultCls(MetaCls):
+    """This class manages the regression tests in a columnar format.
+
+    Each field of the tests is an array with one entry per test, i.e. the result, the bundle, the
+    period and whether the evaluation is normalized. The specifications are deduplicated into a
+    parameter table, which is an archive of the copulas, and each test refers to its
+    specification by position. The vault is a directory with one .npy file per column, which are
+    memory-mapped on load.
+    """
+
+    def __init__(self, columns, archive):
+        """Init class."""
+        self.attr = dict()
+        self.attr['num_tests'] = columns['rslt'].size
+        self.attr['columns'] = columns
+        self.attr['archive'] = archive
+
+    @classmethod
+    def from_tests(cls, tests):
+        """Collect the columns of the tests [rslt, x, y, period, is_normalized, copula_spec]."""
+        positions, copulas, copula_idx = dict(), [], []
+        for test in tests:
+            key = get_canonical(test[-1])
+            if key not in positions:
+                positions[key] = len(copulas)
+                copulas += [UtilityCopulaCls(test[-1])]
+            copula_idx += [positions[key]]
+
+        columns = dict()
+        labels = ['rslt', 'x', 'y', 'period', 'is_normalized']
+        for i, (label, dtype) in enumerate(zip(labels, [float, float, float, int, bool])):
+            columns[label] = np.array([test[i] for test in tests], dtype=dtype)
+        columns['copula_idx'] = np.array(copula_idx, dtype=int)
+
+        return cls(columns, CopulaArchiveCls.from_copulas(copulas))
+
+    def save(self, dirname):
+        """Save the vault to a directory with one .npy file per column."""
+        os.makedirs(dirname, exist_ok=True)
+
+        for label, array in self.attr['columns'].items():
+            np.save(os.path.join(dirname, label + '.npy'), array)
+
+        # The columns of the parameter table are distinguished by a prefix.
+        for label, array in self.attr['archive'].attr['columns'].items():
+            np.save(os.path.join(dirname, 'spec_' + label + '.npy'), array)
+
+    @classmethod
+    def load(cls, dirname):
+        """Load the vault from a directory, where all columns are memory-mapped."""
+        columns, spec_columns = dict(), dict()
+        for fname in sorted(os.listdir(dirname)):
+            if not fname.endswith('.npy'):
+                continue
+
+            label = fname[:-len('.npy')]
+            array = np.load(os.path.join(dirname, fname), mmap_mode='r')
+            if label.startswith('spec_'):
+                spec_columns[label[len('spec_'):]] = array
+            else:
+                columns[label] = array
+
+        return cls(columns, CopulaArchiveCls(spec_columns))
+
+    def replay(self, num_tests=None, atol=1.5e-7, max_share=0.025, max_deviation=5e-5):
+        """Replay the first tests, where the tests of each specification are checked at once.
+
+        Each copula is constructed from its specification, including the fitting, and then
+        evaluated for all its tests in a single batched evaluation. A test is a mismatch if its
+        result deviates by more than atol, i.e. in the first seven decimals as for the single
+        evaluations of the original vault, where the deviation is relative for results beyond one
+        in magnitude. Due to slight numerical differences across machines,
+        about one and a half percent of the tests are mismatches. All mismatches are collected
+        first and an AssertionError is raised only if their share exceeds max_share or any of them
+        deviates by more than max_deviation. The rows of the mismatches are returned otherwise.
+        """
+        columns, archive = self.attr['columns'], self.attr['archive']
+        num_tests = num_tests or self.attr['num_tests']
+
+        copula_idx = np.asarray(columns['copula_idx'][:num_tests])
+        is_normalized = np.asarray(columns['is_normalized'][:num_tests])
+
+        # The tests are grouped by their specification and whether they are normalized.
+        group = 2 * copula_idx + is_normalized
+        order = np.argsort(group, kind='stable')
+
+        deviation = np.empty(num_tests)
+
+        groups, starts = np.unique(group[order], return_index=True)
+        stops = np.append(starts[1:], num_tests)
+        for group_, start, stop in zip(groups.tolist(), starts.tolist(), stops.tolist()):
+            rows = order[start:stop]
+
+            copula = UtilityCopulaCls(archive.get_copula_spec(group_ // 2))
+
+            # The scaled Archimedean copula does not depend on the period.
+            t = columns['period'][rows] if copula.version in ['nonstationary', 'warmglow'] else 0
+
+            x, y = columns['x'][rows], columns['y'][rows]
+            rslt = copula.evaluate(x=x, y=y, t=t, is_normalized=bool(group_ % 2))
+
+            # Large results differ in their last digits between single and batched evaluations.
+            expected = columns['rslt'][rows]
+            deviation[rows] = np.abs(rslt - expected) / np.maximum(np.abs(expected), 1.0)
+
+        # Results that are not a number never match.
+        deviation[np.isnan(deviation)] = np.inf
+        mismatches = np.flatnonzero(deviation > atol)
+
+        if mismatches.size > max_share * num_tests or np.any(deviation > max_deviation):
+            raise AssertionError('{:} of {:} tests mismatch with a maximum deviation of {:}'.format(
+                mismatches.size, num_tests, np.max(deviation)))
+
+        return mismatches
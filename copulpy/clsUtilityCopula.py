@@ -6,11 +6,14 @@ import numpy as np
 from copulpy.clsScaledArchimedean import ScaledArchimedeanCls
 from copulpy.clsNonstationaryUtil import NonstationaryUtilCls
 from copulpy.shared.auxiliary import distribute_copula_spec
+from copulpy.shared.auxiliary import get_periods
 from copulpy.clsWarmglowUtil import WarmglowUtilCls
 from copulpy.clsExponential import ExponentialCls
-from copulpy.config_copulpy import IS_DEBUG
+from copulpy.shared.validation import get_validation_mode
+from copulpy.shared.validation import assert_range
+from copulpy.shared.backend import get_backend
 from copulpy.clsPower import PowerCls
-from copulpy.clsMeta import MetaCls
+from copulpy.clsMeta import SlotsMetaCls
 
 from copulpy.attribute_check.check_scaled_archimedean import check_attributes_scaled_archimedean
 from copulpy.attribute_check.check_nonstationary import check_attributes_nonstationary
@@ -21,27 +24,17 @@ from copulpy.monitoring.monitoring_nonstationary import log_nonstationary
 from copulpy.monitoring.monitoring_warmglow import log_warmglow
 
 
-class UtilityCopulaCls(MetaCls):
+class UtilityCopulaCls(SlotsMetaCls):
     """Manage all things related to the multiattribute utility copulas."""
+    __slots__ = ('version', 'copula', 'marginals', 'x_uniattribute_utility',
+                 'y_uniattribute_utility', 'bounds', 'delta', 'u_1', 'u_2', 'unrestricted_weights',
+                 'discount_factors', 'discounting', 'y_scale', 'alpha', 'gamma', 'beta', '_logging',
+                 '_check_attributes')
 
     def __init__(self, copula_spec):
         """Init class."""
-        version = distribute_copula_spec(copula_spec, 'version')
-        self.attr = dict()
-        self.attr['version'] = version
-
-        # Assign correct monitoring and attribute checks function.
-        if version in ['scaled_archimedean']:
-            self._logging = partial(log_scaled_archimedean, self)
-            self._check_attributes = partial(check_attributes_scaled_archimedean, self)
-        elif version in ['nonstationary']:
-            self._logging = partial(log_nonstationary, self)
-            self._check_attributes = partial(check_attributes_nonstationary, self)
-        elif version in ['warmglow']:
-            self._logging = partial(log_warmglow, self)
-            self._check_attributes = partial(check_attributes_warmglow, self)
-        else:
-            raise NotImplementedError
+        self._assign_attributes(copula_spec)
+        version = self.version
 
         # Handle other attributes
         if version in ['scaled_archimedean']:
@@ -56,12 +49,8 @@ class UtilityCopulaCls(MetaCls):
                 elif marginal == 'exponential':
                     marginal_utility += [ExponentialCls(r[i], a, b, bounds[i])]
 
-            self.attr['x_uniattribute_utility'] = marginal_utility[0]
-            self.attr['y_uniattribute_utility'] = marginal_utility[1]
-            self.attr['bounds'] = bounds
-            self.attr['delta'] = delta
-            self.attr['u_1'] = u[0]
-            self.attr['u_2'] = u[1]
+            self.x_uniattribute_utility = marginal_utility[0]
+            self.y_uniattribute_utility = marginal_utility[1]
 
             copula = ScaledArchimedeanCls(generating_function, u[0], u[1], delta)
 
@@ -71,14 +60,6 @@ class UtilityCopulaCls(MetaCls):
             alpha, beta, gamma, discount_factors, y_scale, unrestricted_weights, discounting = \
                 distribute_copula_spec(copula_spec, *args)
 
-            self.attr['unrestricted_weights'] = unrestricted_weights
-            self.attr['discount_factors'] = discount_factors
-            self.attr['discounting'] = discounting
-            self.attr['y_scale'] = y_scale
-            self.attr['alpha'] = alpha
-            self.attr['gamma'] = gamma
-            self.attr['beta'] = beta
-
             if version in ['nonstationary']:
 
                 copula = NonstationaryUtilCls(
@@ -97,14 +78,69 @@ class UtilityCopulaCls(MetaCls):
         else:
             raise NotImplementedError
 
-        self.attr['copula'] = copula
+        self.copula = copula
         self._check_attributes()
         self._logging()
 
+    @classmethod
+    def restore(cls, copula_spec, copula, marginal_utility=None):
+        """Restore the copula from its specification and its restored components.
+
+        There is no fitting, validation or logging. The marginal utilities are only required for
+        the scaled Archimedean copula.
+        """
+        utility_copula = cls.__new__(cls)
+        utility_copula._assign_attributes(copula_spec)
+        if marginal_utility is not None:
+            utility_copula.x_uniattribute_utility, utility_copula.y_uniattribute_utility = \
+                marginal_utility
+        utility_copula.copula = copula
+        return utility_copula
+
+    def _assign_attributes(self, copula_spec):
+        """Assign the version, the parameters of the specification and the checks."""
+        version = distribute_copula_spec(copula_spec, 'version')
+        self.version = version
+
+        # Assign correct monitoring and attribute checks function.
+        if version in ['scaled_archimedean']:
+            self._logging = partial(log_scaled_archimedean, self)
+            self._check_attributes = partial(check_attributes_scaled_archimedean, self)
+        elif version in ['nonstationary']:
+            self._logging = partial(log_nonstationary, self)
+            self._check_attributes = partial(check_attributes_nonstationary, self)
+        elif version in ['warmglow']:
+            self._logging = partial(log_warmglow, self)
+            self._check_attributes = partial(check_attributes_warmglow, self)
+        else:
+            raise NotImplementedError
+
+        if version in ['scaled_archimedean']:
+            marginals, bounds, delta, u = \
+                distribute_copula_spec(copula_spec, 'marginals', 'bounds', 'delta', 'u')
+
+            self.marginals = marginals
+            self.bounds = bounds
+            self.delta = delta
+            self.u_1 = u[0]
+            self.u_2 = u[1]
+        else:
+            args = ['alpha', 'beta', 'gamma', 'discount_factors', 'y_scale',
+                    'unrestricted_weights', 'discounting']
+            alpha, beta, gamma, discount_factors, y_scale, unrestricted_weights, discounting = \
+                distribute_copula_spec(copula_spec, *args)
+
+            self.unrestricted_weights = unrestricted_weights
+            self.discount_factors = discount_factors
+            self.discounting = discounting
+            self.y_scale = y_scale
+            self.alpha = alpha
+            self.gamma = gamma
+            self.beta = beta
+
     def evaluate(self, x, y, t=0, is_normalized=False):
         """Evaluate the multiattribute utility function."""
-        attr = ['version', 'copula']
-        version, copula = self.get_attr(attr)
+        version, copula = self.version, self.copula
 
         # Check integrity of class and request
         self._check_attributes()
@@ -112,20 +148,23 @@ class UtilityCopulaCls(MetaCls):
 
         if version in ['scaled_archimedean']:
             # Distribute class attributes
-            attr = ['x_uniattribute_utility', 'y_uniattribute_utility']
-            x_uniattribute_utility, y_uniattribute_utility = self.get_attr(attr)
-
-            # Construct the normalized points of evaluation.
-            if not is_normalized:
-                v_1, v_2 = 0.0, 0.0
-                if np.min(x) > 0:
-                    v_1 = x_uniattribute_utility.evaluate(x, True)
-                if np.min(y) > 0:
-                    v_2 = y_uniattribute_utility.evaluate(y, True)
+            x_uniattribute_utility, y_uniattribute_utility = \
+                self.x_uniattribute_utility, self.y_uniattribute_utility
+
+            # Unless all checks are run, the request and the return value are only validated here
+            # and the marginals and the copula skip their checks.
+            components = [x_uniattribute_utility, y_uniattribute_utility, copula]
+            label = 'evaluate' if get_validation_mode() in ['full'] else '_evaluate'
+            evaluate_x, evaluate_y, evaluate_copula = [getattr(obj, label) for obj in components]
+
+            # Construct the normalized points of evaluation. The normalized marginals are exactly
+            # zero at the origin, so arrays with zero and positive entries are evaluated at once.
+            if is_normalized:
+                rslt = evaluate_copula(x, y)
+            elif self._is_fused(x, y):
+                rslt = self._evaluate_fused(x, y)
             else:
-                v_1, v_2 = x, y
-
-            rslt = copula.evaluate(v_1=v_1, v_2=v_2)
+                rslt = evaluate_copula(evaluate_x(x, True), evaluate_y(y, True))
 
         elif version in ['nonstationary', 'warmglow']:
             rslt = copula.evaluate(x=x, y=y, t=t)
@@ -137,11 +176,146 @@ class UtilityCopulaCls(MetaCls):
 
         return rslt
 
+    def evaluator(self, is_normalized=False):
+        """Get a specialized function that evaluates the utility function for a single request.
+
+        The function has the signature (x, y, t=0). The version dispatch is resolved and all
+        parameters are bound once, so there are no attribute lookups and no checks per call. The
+        attributes are checked only here and the function reflects the parameters at the time of
+        its creation.
+        """
+        version, copula = self.version, self.copula
+
+        # Check integrity of class
+        self._check_attributes()
+
+        if version in ['scaled_archimedean']:
+            x_uniattribute_utility, y_uniattribute_utility = \
+                self.x_uniattribute_utility, self.y_uniattribute_utility
+
+            evaluate_copula = copula.evaluator()
+
+            if is_normalized:
+                def evaluate(x, y, t=0):
+                    """Evaluate the multiattribute utility function."""
+                    return evaluate_copula(x, y)
+            else:
+                evaluate_x = x_uniattribute_utility.evaluator(True)
+                evaluate_y = y_uniattribute_utility.evaluator(True)
+
+                def evaluate(x, y, t=0):
+                    """Evaluate the multiattribute utility function."""
+                    return evaluate_copula(evaluate_x(x), evaluate_y(y))
+
+        elif version in ['nonstationary', 'warmglow']:
+            evaluate = copula.evaluator()
+        else:
+            raise NotImplementedError
+
+        return evaluate
+
+    def evaluate_grid(self, x, y, t=0, **params):
+        """Evaluate the multiattribute utility function for a whole grid of parameters at once.
+
+        This is available for the nonstationary and warmglow versions, where any of alpha, beta,
+        gamma and y_scale can be passed as arrays. The result has the shape of the parameters
+        followed by the shape of the data.
+        """
+        version, copula = self.version, self.copula
+
+        # Check integrity of class and request
+        self._check_attributes()
+        self._additional_checks(version, 'evaluate_in', x, y, t, False)
+
+        if version in ['nonstationary', 'warmglow']:
+            rslt = copula.evaluate_grid(x=x, y=y, t=t, **params)
+        else:
+            raise NotImplementedError
+
+        # Checks on return value
+        self._additional_checks(version, 'evaluate_out', rslt)
+
+        return rslt
+
+    def evaluate_gradient(self, x, y, t=0, **params):
+        """Evaluate the multiattribute utility function together with its parameter gradient.
+
+        This is available for the nonstationary and warmglow versions. The gradient is a dictionary
+        of derivatives with respect to the parameters of the copula.
+        """
+        version, copula = self.version, self.copula
+
+        # Check integrity of class and request
+        self._check_attributes()
+        self._additional_checks(version, 'evaluate_in', x, y, t, False)
+
+        if version in ['nonstationary', 'warmglow']:
+            rslt, grad = copula.evaluate_gradient(x=x, y=y, t=t, **params)
+        else:
+            raise NotImplementedError
+
+        # Checks on return value
+        self._additional_checks(version, 'evaluate_out', rslt)
+
+        return rslt, grad
+
+    def to_bytes(self):
+        """Get the copula and all its derived quantities in a compact binary format."""
+        from copulpy.clsCopulaArchive import CopulaArchiveCls
+        return CopulaArchiveCls.from_copulas([self]).to_bytes()
+
     @staticmethod
-    def _additional_checks(version, label, *args):
+    def from_bytes(data):
+        """Restore a copula from its binary format without fitting or validation."""
+        from copulpy.clsCopulaArchive import CopulaArchiveCls
+        return CopulaArchiveCls.from_bytes(data)[0]
+
+    def _is_fused(self, x, y):
+        """Check whether the marginals and the copula are evaluated in a single compiled pass.
+
+        This is the case for arrays in the numba backend, unless all internal checks are run.
+        """
+        if np.ndim(x) == 0 and np.ndim(y) == 0:
+            return False
+
+        return get_backend() in ['numba'] and get_validation_mode() not in ['full']
+
+    def _evaluate_fused(self, x, y):
+        """Evaluate the scaled Archimedean copula of the marginals with a single compiled kernel."""
+        from copulpy.kernels.kernels_numba import scaled_archimedean_utility_kernel_1
+
+        marginals, copula = self.marginals, self.copula
+
+        np.testing.assert_equal(copula.generating_function_id in [1], True)
+
+        marginal_1 = marginals[0], self.x_uniattribute_utility.normalization
+        marginal_2 = marginals[1], self.y_uniattribute_utility.normalization
+        m, delta, denominator = copula.m, copula.delta, copula.denominator
+
+        return scaled_archimedean_utility_kernel_1(
+            x, y, marginal_1, marginal_2, delta, m[0], m[1], denominator)
+
+    def _additional_checks(self, version, label, *args):
         """Perform some additional checks on selected features of the class instance."""
         # We only run these tests during debugging as otherwise the performance deteriorates.
-        if not IS_DEBUG:
+        mode = get_validation_mode()
+        if mode in ['off']:
+            return
+
+        # In the batch mode, the request and the return value are validated in a single pass each.
+        # This includes the upper bounds of the marginals, as these skip their checks.
+        if mode in ['batch']:
+            if label in ['evaluate_in']:
+                x, y, _, is_normalized = args
+                upper = [np.inf, np.inf]
+                if version in ['scaled_archimedean'] and not is_normalized:
+                    upper = [self.x_uniattribute_utility.upper_bound,
+                             self.y_uniattribute_utility.upper_bound]
+                assert_range(x, 0.0, upper[0])
+                assert_range(y, 0.0, upper[1])
+            elif label in ['evaluate_out']:
+                rslt, = args
+                assert_range(rslt, 0.0, 1.0 if version in ['scaled_archimedean'] else np.inf)
             return
 
         if label in ['evaluate_in']:
@@ -155,7 +329,8 @@ class UtilityCopulaCls(MetaCls):
             if version in ['scaled_archimedean']:
                 np.testing.assert_equal(isinstance(is_normalized, (bool, np.bool_)), True)
             elif version in ['nonstationary', 'warmglow']:
-                np.testing.assert_equal(isinstance(t, int), True)
+                # Floats with integral values are valid periods, while all others raise a KeyError.
+                get_periods(t)
 
         elif label in ['evaluate_out']:
             rslt, = args
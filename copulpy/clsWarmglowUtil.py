@@ -4,61 +4,91 @@ from functools import partial
 import numpy as np
 
 from copulpy.attribute_check.check_warmglow import check_attributes_warmglow
+from copulpy.clsPeriodFunction import get_discount_function
+from copulpy.clsPeriodFunction import y_weight_constant
+from copulpy.clsPeriodFunction import PeriodFunctionCls
+from copulpy.clsPeriodTable import PeriodTableCls
 from copulpy.config_copulpy import HUGE_FLOAT
-from copulpy.clsMeta import MetaCls
+from copulpy.shared.backend import get_kernel
+from copulpy.clsMeta import SlotsMetaCls
 
 
-class WarmglowUtilCls(MetaCls):
+class WarmglowUtilCls(SlotsMetaCls):
     """Manage the warm glow utility function."""
+    __slots__ = ('unrestricted_weights', 'y_scale', 'alpha', 'gamma', 'beta', 'warmglow_type',
+                 'discount_factors', 'y_weights', '_check_attributes_warmglow')
 
     def __init__(self, alpha, beta, gamma, discount_factors, y_scale,
                  unrestricted_weights=None, discounting=None, warmglow_type="constant"):
         """Initialize warmglow utility function."""
-        self.attr = dict()
-        self.attr['y_scale'] = y_scale  # weight on utility from charity euro
-        self.attr['alpha'] = alpha  # warm glow parameter
-        self.attr['gamma'] = gamma  # correlation aversion
-        self.attr['beta'] = beta  # risk aversion for self and charity euro
-        self.attr["warmglow_type"] = warmglow_type
+        self._assign_attributes(alpha, beta, gamma, y_scale, unrestricted_weights, warmglow_type)
 
         np.testing.assert_equal(warmglow_type in ["constant", "linear"], True)
 
         if discounting is not None:
-            # Implement exponential discounting or hyperbolic discounting
+            # Implement exponential discounting or hyperbolic discounting, which is evaluated in
+            # closed form for arbitrary periods.
             np.testing.assert_equal(discounting in ['exponential', 'hyperbolic'], True)
-
-            if discounting in ['hyperbolic']:
-                df_beta = discount_factors[0]
-                df_delta = discount_factors[1]
-
-                new_dfx = {
-                    t: (df_beta * df_delta ** t if t > 0.0 else 1) for t in discount_factors.keys()
-                }
-            elif discounting in ['exponential']:
-                df_delta = discount_factors[0]
-                new_dfx = {t: (df_delta ** t if t > 0.0 else 1) for t in discount_factors.keys()}
-            self.attr['discount_factors'] = new_dfx
+            self.discount_factors = get_discount_function(discounting, discount_factors)
         else:
             # Implement nonparametric discounting.
-            self.attr['discount_factors'] = discount_factors
+            self.discount_factors = PeriodTableCls(discount_factors)
 
         # Optional argument: nonparametric weight on y_t in the CES function.
         if unrestricted_weights is None:
-            df = self.attr['discount_factors']
-            y_weights = {t: y_scale for t, d_t in df.items()}
-            self.attr['y_weights'] = y_weights
+            df = self.discount_factors
+            if discounting is not None:
+                self.y_weights = self._get_y_weight_function()
+            else:
+                y_weights = {t: y_scale for t, d_t in df.items()}
+                self.y_weights = PeriodTableCls(y_weights)
         else:
             # Nonparametric weight: no g() function applied in this case.
-            self.attr['y_weights'] = unrestricted_weights
+            self.y_weights = PeriodTableCls(unrestricted_weights)
 
-        self._check_attributes_warmglow = partial(check_attributes_warmglow, self)
         self._check_attributes_warmglow()
 
+    @classmethod
+    def restore(cls, alpha, beta, gamma, discount_factors, y_scale, unrestricted_weights,
+                warmglow_type, y_weights=None):
+        """Restore the utility function from its tables or discount function without checks.
+
+        The weights on y are derived from the discount function if they are not tabulated.
+        """
+        util = cls.__new__(cls)
+        util._assign_attributes(alpha, beta, gamma, y_scale, unrestricted_weights, warmglow_type)
+        util.discount_factors = discount_factors
+        if y_weights is None:
+            y_weights = util._get_y_weight_function()
+        util.y_weights = y_weights
+        return util
+
+    def _assign_attributes(self, alpha, beta, gamma, y_scale, unrestricted_weights,
+                           warmglow_type):
+        """Assign the parameters of the utility function."""
+        self.unrestricted_weights = unrestricted_weights
+        self.y_scale = y_scale  # weight on utility from charity euro
+        self.alpha = alpha  # warm glow parameter
+        self.gamma = gamma  # correlation aversion
+        self.beta = beta  # risk aversion for self and charity euro
+        self.warmglow_type = warmglow_type
+
+        self._check_attributes_warmglow = partial(check_attributes_warmglow, self)
+
+    def _get_y_weight_function(self):
+        """Get the constant weights on y for the closed-form discount function."""
+        function = partial(y_weight_constant, self.y_scale)
+        return PeriodFunctionCls(function, self.discount_factors.keys())
+
     def evaluate(self, x, y, t=0):
         """Evaluate the flow utility from consumption (x,y) in period t."""
-        alpha, beta, gamma, y_weights, discount_factors, warmglow_type = \
-            self.get_attr(
-                'alpha', 'beta', 'gamma', 'y_weights', 'discount_factors', 'warmglow_type')
+        # Arrays of bundles and periods are evaluated in a single vectorized pass.
+        if np.ndim(x) > 0 or np.ndim(y) > 0 or np.ndim(t) > 0:
+            return self._evaluate_array(x, y, t)
+
+        alpha, beta, gamma = self.alpha, self.beta, self.gamma
+        y_weights, discount_factors, warmglow_type = \
+            self.y_weights, self.discount_factors, self.warmglow_type
         # Marginals: power utility
         v_1 = x ** beta
         v_2 = y ** beta
@@ -90,3 +120,208 @@ class WarmglowUtilCls(MetaCls):
                 utils = HUGE_FLOAT
 
         return utils
+
+    def evaluator(self):
+        """Get a specialized function that evaluates the flow utility for a single bundle.
+
+        All parameters are bound as local variables and the period-specific parameters are looked
+        up directly. The function reflects the parameters at the time of its creation.
+        """
+        alpha, beta, gamma = self.alpha, self.beta, self.gamma
+        y_weights, discount_factors, warmglow_type = \
+            self.y_weights, self.discount_factors, self.warmglow_type
+
+        if warmglow_type not in ["constant", "linear"]:
+            raise NotImplementedError
+        is_linear = warmglow_type in ["linear"]
+
+        get_discount_factor, get_y_weight = discount_factors.get_lookup(), y_weights.get_lookup()
+        exponent = 1.0 / gamma
+
+        def evaluate(x, y, t=0):
+            """Evaluate the flow utility from consumption (x,y) in period t."""
+            # Case distinction to avoid overflow error
+            if y == 0.0:
+                return 0.0 if x == 0.0 else get_discount_factor(t) * x ** beta
+
+            # Warm glow utility
+            warmglow = alpha * y if is_linear else alpha
+
+            if x == 0.0:
+                return warmglow + get_discount_factor(t) * get_y_weight(t) * y ** beta
+
+            try:
+                utils = ((x ** beta) ** gamma + (get_y_weight(t) * y ** beta) ** gamma)
+                return get_discount_factor(t) * utils ** exponent + warmglow
+            # Sometimes an overflow error occurs.
+            except ArithmeticError:
+                return HUGE_FLOAT
+
+        return evaluate
+
+    def evaluate_grid(self, x, y, t=0, **params):
+        """Evaluate the flow utility for a whole grid of parameters at once.
+
+        Any of alpha, beta, gamma and y_scale can be passed as arrays, which broadcast against each
+        other. The result has the shape of the parameters followed by the shape of the data.
+        """
+        args = self._get_grid_arguments(x, y, t, params)[:-1]
+        return warmglow_kernel(*args, self.warmglow_type)
+
+    def evaluate_gradient(self, x, y, t=0, **params):
+        """Evaluate the flow utility together with its gradient with respect to all parameters.
+
+        The parameters can be replaced just as for evaluate_grid. The gradient is a dictionary with
+        the derivatives with respect to alpha, beta, gamma, and y_scale as well as the discount
+        factors and, if specified, the unrestricted weights. The derivatives for the last two are
+        stacked along a trailing axis in the order of their periods or parameters.
+        """
+        x, y, alpha, beta, gamma, discount_factor, y_weight, t = \
+            self._get_grid_arguments(x, y, t, params)
+
+        y_weights, discount_factors, warmglow_type = \
+            self.y_weights, self.discount_factors, self.warmglow_type
+        unrestricted_weights = self.unrestricted_weights
+
+        utils = warmglow_kernel(
+            x, y, alpha, beta, gamma, discount_factor, y_weight, warmglow_type)
+
+        grad_alpha, grad_beta, grad_gamma, grad_weight, grad_discount = warmglow_gradient(
+            x, y, alpha, beta, gamma, discount_factor, y_weight, warmglow_type, utils)
+
+        grad = dict()
+        grad['alpha'] = grad_alpha
+        grad['beta'] = grad_beta
+        grad['gamma'] = grad_gamma
+        if unrestricted_weights is None:
+            grad['y_scale'] = grad_weight
+        else:
+            grad['y_scale'] = np.zeros_like(utils)
+            grad['unrestricted_weights'] = grad_weight[..., None] * y_weights.get_gradient(t)
+        grad['discount_factors'] = grad_discount[..., None] * discount_factors.get_gradient(t)
+
+        return utils, grad
+
+    def _get_grid_arguments(self, x, y, t, params):
+        """Get the arguments of the kernel, where the parameters are aligned with the data."""
+        labels = ['alpha', 'beta', 'gamma', 'y_scale']
+        np.testing.assert_equal(set(params.keys()).issubset(labels), True)
+
+        alpha, beta, gamma, y_scale = np.broadcast_arrays(
+            *[np.asarray(params.get(label, getattr(self, label)), dtype=float) for label in labels])
+
+        y_weights, discount_factors, unrestricted_weights = \
+            self.y_weights, self.discount_factors, self.unrestricted_weights
+
+        x, y, t = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float), t)
+        discount_factor = discount_factors[t]
+
+        # The parameters are aligned along the leading axes and the data along the trailing axes.
+        shape = alpha.shape + (1,) * x.ndim
+        alpha, beta, gamma, y_scale = [
+            var.reshape(shape) for var in [alpha, beta, gamma, y_scale]]
+
+        if unrestricted_weights is None:
+            y_weight = y_scale
+        else:
+            y_weight = y_weights[t]
+
+        return x, y, alpha, beta, gamma, discount_factor, y_weight, t
+
+    def _evaluate_array(self, x, y, t):
+        """Evaluate the flow utility elementwise for arrays of bundles and periods."""
+        alpha, beta, gamma = self.alpha, self.beta, self.gamma
+        y_weights, discount_factors, warmglow_type = \
+            self.y_weights, self.discount_factors, self.warmglow_type
+
+        x, y, t = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float), t)
+        discount_factor, y_weight = discount_factors[t], y_weights[t]
+
+        # The kernel of the active backend evaluates all elements in a single pass.
+        return get_kernel(warmglow_kernel)(
+            x, y, alpha, beta, gamma, discount_factor, y_weight, warmglow_type)
+
+
+def warmglow_kernel(x, y, alpha, beta, gamma, discount_factor, y_weight, warmglow_type):
+    """Evaluate the warm glow utility elementwise, where all arguments broadcast."""
+    # Warm glow utility
+    if warmglow_type in ["constant"]:
+        warmglow = alpha
+    elif warmglow_type in ["linear"]:
+        warmglow = alpha * y
+    else:
+        raise NotImplementedError
+
+    # The case distinction of the scalar evaluation is replaced by masks and the overflow error by
+    # a check for values that are not finite.
+    with np.errstate(over='ignore', invalid='ignore'):
+        # Marginals: power utility
+        v_1 = x ** beta
+        v_2 = y ** beta
+
+        utils = ((v_1 ** gamma) + ((y_weight * v_2) ** gamma)) ** (1.0 / gamma)
+        utils = discount_factor * utils + warmglow
+
+        is_zero_x, is_zero_y = (x == 0.0), (y == 0.0)
+
+        utils = np.where(is_zero_x & (y > 0.0), warmglow + discount_factor * y_weight * v_2, utils)
+        utils = np.where((x > 0.0) & is_zero_y, discount_factor * v_1, utils)
+        utils = np.where(is_zero_x & is_zero_y, 0.0, utils)
+
+    # The overflow is only mapped once all cases are combined, as it may occur in any of them.
+    return np.where(np.isfinite(utils), utils, HUGE_FLOAT)
+
+
+def warmglow_gradient(x, y, alpha, beta, gamma, discount_factor, y_weight, warmglow_type, utils):
+    """Evaluate the derivatives of the warm glow utility elementwise.
+
+    The derivatives are with respect to alpha, beta, gamma, the weight on y, and the discount
+    factor.
+    """
+    # Warm glow utility
+    if warmglow_type in ["constant"]:
+        grad_warmglow = np.ones_like(utils)
+    elif warmglow_type in ["linear"]:
+        grad_warmglow = y + np.zeros_like(utils)
+    else:
+        raise NotImplementedError
+
+    with np.errstate(all='ignore'):
+        log_x, log_y = np.log(x), np.log(y)
+
+        # Both positive, where the warm glow does not enter the CES aggregate.
+        a = (x ** beta) ** gamma
+        b = (y_weight * y ** beta) ** gamma
+        ces = (a + b) ** (1.0 / gamma)
+
+        grad_alpha = grad_warmglow
+        grad_beta = discount_factor * ces * (a * log_x + b * log_y) / (a + b)
+        grad_gamma = -np.log(a + b) / gamma ** 2
+        grad_gamma += (a * beta * log_x + b * (np.log(y_weight) + beta * log_y)) / (gamma * (a + b))
+        grad_gamma *= discount_factor * ces
+        grad_weight = discount_factor * ces * b / ((a + b) * y_weight)
+        grad_discount = ces
+
+        # Only y positive
+        is_case = (x == 0.0) & (y > 0.0)
+        v_2 = y ** beta
+        grad_beta = np.where(is_case, discount_factor * y_weight * v_2 * log_y, grad_beta)
+        grad_gamma = np.where(is_case, 0.0, grad_gamma)
+        grad_weight = np.where(is_case, discount_factor * v_2, grad_weight)
+        grad_discount = np.where(is_case, y_weight * v_2, grad_discount)
+
+        # Only x positive, where there is no warm glow.
+        is_case = (x > 0.0) & (y == 0.0)
+        v_1 = x ** beta
+        grad_alpha = np.where(is_case, 0.0, grad_alpha)
+        grad_beta = np.where(is_case, discount_factor * v_1 * log_x, grad_beta)
+        grad_gamma = np.where(is_case, 0.0, grad_gamma)
+        grad_weight = np.where(is_case, 0.0, grad_weight)
+        grad_discount = np.where(is_case, v_1, grad_discount)
+
+        # The utility is constant if both are zero or it overflows.
+        is_constant = ((x == 0.0) & (y == 0.0)) | (utils == HUGE_FLOAT)
+        grads = [grad_alpha, grad_beta, grad_gamma, grad_weight, grad_discount]
+        grads = [np.where(is_constant, 0.0, grad) for grad in grads]
+
+    return grads
@@ -9,3 +9,28 @@ PACKAGE_DIR = os.path.dirname(os.path.realpath(__file__))
 IS_DEBUG = False
 if os.getenv('COPULPY_DEV') == 'TRUE':
     IS_DEBUG = True
+
+# The validation mode is either 'off', 'batch' or 'full' and can also be changed at runtime, see
+# copulpy.shared.validation. All debugging checks are run in the development environment.
+VALIDATION_MODE = os.getenv('COPULPY_VALIDATION', 'full' if IS_DEBUG else 'off')
+
+# The fitted coefficients of the scaled Archimedean copula are cached for the whole process. The
+# cache is persisted to the file named in the environment variable, if set.
+COEFFICIENT_CACHE_SIZE = 10000
+COEFFICIENT_CACHE_FILE = os.getenv('COPULPY_COEFFICIENT_CACHE')
+
+# The copulas that are constructed through copulpy.clsCopulaCache.get_copula are cached for the
+# whole process.
+COPULA_CACHE_SIZE = 1000
+
+# The monitoring records are discarded by default to avoid any disk I/O when constructing copulas.
+# The environment variable selects one of the other sinks, i.e. 'memory' or 'file'.
+MONITORING_SINK = os.getenv('COPULPY_MONITORING', 'none')
+
+# The closed-form discount functions memoize this many periods at most.
+PERIOD_CACHE_SIZE = 1024
+
+# The elementwise kernels are evaluated with either the 'numpy' or the 'numba' backend, which can
+# also be changed at runtime, see copulpy.shared.backend. The compiled kernels are slower than the
+# NumPy kernels on a single core for all sizes, so numba has to be requested explicitly.
+KERNEL_BACKEND = os.getenv('COPULPY_BACKEND', 'numpy')
@@ -0,0 +1,32 @@
+"""Provide the logit choice probabilities and likelihoods for the estimation."""
+import numpy as np
+
+
+def get_log_sum_exp(v):
+    """Compute the log-sum-exp over the options along the last axis in a stable way."""
+    v_max = np.max(v, axis=-1, keepdims=True)
+
+    # The shift ensures that the largest exponent is zero and thus avoids any overflow.
+    with np.errstate(invalid='ignore'):
+        rslt = np.log(np.sum(np.exp(v - v_max), axis=-1)) + v_max[..., 0]
+
+    return rslt
+
+
+def get_choice_probabilities(utils, choice_scale=1.0):
+    """Compute the logit choice probabilities for all options along the last axis."""
+    v = np.asarray(utils) / choice_scale
+    return np.exp(v - get_log_sum_exp(v)[..., None])
+
+
+def get_log_likelihood(utils, choices, choice_scale=1.0):
+    """Compute the total log-likelihood of the choices, which are summed over the last axis."""
+    v = np.asarray(utils) / choice_scale
+    v_chosen = np.take_along_axis(v, np.broadcast_to(choices[:, None], v.shape[:-1] + (1,)), -1)
+    return np.sum(v_chosen[..., 0] - get_log_sum_exp(v), axis=-1)
+
+
+def get_log_likelihood_gradient(grad_v, probs, choices):
+    """Compute the derivative of the total log-likelihood from the derivatives of the options."""
+    grad_chosen = np.take_along_axis(grad_v, choices[:, None], -1)[:, 0]
+    return np.sum(grad_chosen - np.sum(probs * grad_v, axis=-1))
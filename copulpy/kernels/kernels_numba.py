@@ -0,0 +1,200 @@
+"""Provide the elementwise kernels of the numba backend.
+
+Each kernel has the same interface as its NumPy counterpart. The public functions align the
+arguments and pass them on to a fused loop, which is compiled just in time and runs in parallel
+across cores. The loops evaluate all cases of an element at once and thus avoid any temporary
+arrays.
+"""
+import numba as nb
+import numpy as np
+
+from copulpy.config_copulpy import HUGE_FLOAT
+
+
+def nonstationary_kernel(x, y, alpha, beta, gamma, discount_factor, y_weight):
+    """Evaluate the nonstationary utility elementwise, where all arguments broadcast."""
+    shape, args = _align_arguments(x, y, discount_factor, y_weight)
+    return _nonstationary_loop(*args[:2], alpha, beta, gamma, *args[2:]).reshape(shape)
+
+
+def warmglow_kernel(x, y, alpha, beta, gamma, discount_factor, y_weight, warmglow_type):
+    """Evaluate the warm glow utility elementwise, where all arguments broadcast."""
+    if warmglow_type not in ["constant", "linear"]:
+        raise NotImplementedError
+    is_linear = warmglow_type in ["linear"]
+
+    shape, args = _align_arguments(x, y, discount_factor, y_weight)
+    return _warmglow_loop(*args[:2], alpha, beta, gamma, *args[2:], is_linear).reshape(shape)
+
+
+def scaled_archimedean_kernel_1(v_1, v_2, delta, m_1, m_2, denominator):
+    """Evaluate the scaled Archimedean copula with the multiplicative generating function."""
+    shape, args = _align_arguments(v_1, v_2)
+    return _scaled_archimedean_loop_1(*args, delta, m_1, m_2, denominator).reshape(shape)
+
+
+def scaled_archimedean_utility_kernel_1(x, y, marginal_1, marginal_2, delta, m_1, m_2,
+                                        denominator):
+    """Evaluate the scaled Archimedean copula of the normalized marginals in a single pass.
+
+    The marginals are described by a tuple of their label, which is either 'power' or
+    'exponential', and their normalization.
+    """
+    shape, args = _align_arguments(x, y)
+    marginals = [(label in ['exponential'], r, d) for label, (r, d) in [marginal_1, marginal_2]]
+    rslt = _scaled_archimedean_utility_loop_1(
+        *args, *marginals[0], *marginals[1], delta, m_1, m_2, denominator)
+    return rslt.reshape(shape)
+
+
+def power_kernel(x, r, denominator):
+    """Evaluate the normalized power utility elementwise."""
+    shape, args = _align_arguments(x)
+    return _marginal_loop(*args, False, r, denominator).reshape(shape)
+
+
+def exponential_kernel(x, r, denominator):
+    """Evaluate the normalized exponential utility elementwise."""
+    shape, args = _align_arguments(x)
+    return _marginal_loop(*args, True, r, denominator).reshape(shape)
+
+
+def is_in_range(x, lower, upper):
+    """Check that all values are finite and within the bounds in a single pass."""
+    _, args = _align_arguments(x)
+    return _is_in_range_loop(*args, lower, upper)
+
+
+def _align_arguments(*args):
+    """Align the arguments as contiguous vectors of the same length."""
+    args = np.broadcast_arrays(*[np.asarray(arg, dtype=float) for arg in args])
+    return args[0].shape, [np.ascontiguousarray(arg).reshape(-1) for arg in args]
+
+
+@nb.njit(cache=True)
+def _nonstationary(x, y, alpha, beta, gamma, discount_factor, y_weight):
+    """Evaluate the nonstationary utility for a single element."""
+    if x == 0.0 and y == 0.0:
+        return 0.0
+
+    # Marginals: power utility
+    v_1 = x ** beta
+    v_2 = y ** (beta * gamma)
+
+    if x == 0.0:
+        utils = discount_factor * y_weight * v_2
+    elif y == 0.0:
+        utils = discount_factor * v_1
+    else:
+        utils = discount_factor * ((v_1 ** alpha) + ((y_weight * v_2) ** alpha)) ** (1.0 / alpha)
+
+    # The overflow is only mapped once all cases are combined, as it may occur in any of them.
+    if not np.isfinite(utils):
+        return HUGE_FLOAT
+
+    return utils
+
+
+@nb.njit(cache=True)
+def _warmglow(x, y, alpha, beta, gamma, discount_factor, y_weight, is_linear):
+    """Evaluate the warm glow utility for a single element."""
+    if x == 0.0 and y == 0.0:
+        return 0.0
+
+    # Marginals: power utility
+    v_1 = x ** beta
+    v_2 = y ** beta
+
+    # Warm glow utility
+    warmglow = alpha * y if is_linear else alpha
+
+    if y == 0.0:
+        utils = discount_factor * v_1
+    elif x == 0.0:
+        utils = warmglow + discount_factor * y_weight * v_2
+    else:
+        utils = ((v_1 ** gamma) + ((y_weight * v_2) ** gamma)) ** (1.0 / gamma)
+        utils = discount_factor * utils + warmglow
+
+    # The overflow is only mapped once all cases are combined, as it may occur in any of them.
+    if not np.isfinite(utils):
+        return HUGE_FLOAT
+
+    return utils
+
+
+@nb.njit(cache=True)
+def _scaled_archimedean_1(v_1, v_2, delta, m_1, m_2, denominator):
+    """Evaluate the scaled Archimedean copula for a single element."""
+    t_1, t_2 = m_1 * v_1, m_2 * v_2
+    return (1.0 - (1.0 - t_1 ** delta) * (1.0 - t_2 ** delta)) ** (1.0 / delta) / denominator
+
+
+@nb.njit(cache=True)
+def _marginal(x, is_exponential, r, denominator):
+    """Evaluate a normalized marginal utility for a single element."""
+    if not is_exponential:
+        return x ** r / denominator
+    if r > 0.0:
+        return (1.0 - np.exp(- r * x)) / denominator
+
+    return x / denominator
+
+
+@nb.njit(parallel=True, cache=True)
+def _nonstationary_loop(x, y, alpha, beta, gamma, discount_factor, y_weight):
+    """Evaluate the nonstationary utility in a single parallel pass."""
+    rslt = np.empty(x.shape[0])
+    for i in nb.prange(x.shape[0]):
+        rslt[i] = _nonstationary(x[i], y[i], alpha, beta, gamma, discount_factor[i], y_weight[i])
+    return rslt
+
+
+@nb.njit(parallel=True, cache=True)
+def _warmglow_loop(x, y, alpha, beta, gamma, discount_factor, y_weight, is_linear):
+    """Evaluate the warm glow utility in a single parallel pass."""
+    rslt = np.empty(x.shape[0])
+    for i in nb.prange(x.shape[0]):
+        rslt[i] = _warmglow(
+            x[i], y[i], alpha, beta, gamma, discount_factor[i], y_weight[i], is_linear)
+    return rslt
+
+
+@nb.njit(parallel=True, cache=True)
+def _scaled_archimedean_loop_1(v_1, v_2, delta, m_1, m_2, denominator):
+    """Evaluate the scaled Archimedean copula in a single parallel pass."""
+    rslt = np.empty(v_1.shape[0])
+    for i in nb.prange(v_1.shape[0]):
+        rslt[i] = _scaled_archimedean_1(v_1[i], v_2[i], delta, m_1, m_2, denominator)
+    return rslt
+
+
+@nb.njit(parallel=True, cache=True)
+def _scaled_archimedean_utility_loop_1(x, y, is_exponential_1, r_1, denominator_1,
+                                       is_exponential_2, r_2, denominator_2, delta, m_1, m_2,
+                                       denominator):
+    """Evaluate the scaled Archimedean copula of the marginals in a single parallel pass."""
+    rslt = np.empty(x.shape[0])
+    for i in nb.prange(x.shape[0]):
+        v_1 = _marginal(x[i], is_exponential_1, r_1, denominator_1)
+        v_2 = _marginal(y[i], is_exponential_2, r_2, denominator_2)
+        rslt[i] = _scaled_archimedean_1(v_1, v_2, delta, m_1, m_2, denominator)
+    return rslt
+
+
+@nb.njit(parallel=True, cache=True)
+def _marginal_loop(x, is_exponential, r, denominator):
+    """Evaluate a normalized marginal utility in a single parallel pass."""
+    rslt = np.empty(x.shape[0])
+    for i in nb.prange(x.shape[0]):
+        rslt[i] = _marginal(x[i], is_exponential, r, denominator)
+    return rslt
+
+
+@nb.njit(cache=True)
+def _is_in_range_loop(x, lower, upper):
+    """Check the values in a single pass, which stops at the first value out of range."""
+    for i in range(x.shape[0]):
+        if not (np.isfinite(x[i]) and lower <= x[i] <= upper):
+            return False
+    return True
@@ -0,0 +1,109 @@
+"""Provide the sinks that receive the monitoring records of the package."""
+from collections import deque
+import atexit
+import os
+
+from copulpy.config_copulpy import MONITORING_SINK
+from copulpy.clsMeta import MetaCls
+
+
+class NullSinkCls(MetaCls):
+    """Discard all monitoring records."""
+
+    def __init__(self):
+        """Init class."""
+        self.attr = dict()
+        self.attr['is_active'] = False
+
+    def write(self, record):
+        """Write a record."""
+        pass
+
+    def flush(self):
+        """Flush all pending records."""
+        pass
+
+
+class MemorySinkCls(MetaCls):
+    """Keep the most recent monitoring records in a ring buffer."""
+
+    def __init__(self, max_records=1000):
+        """Init class."""
+        self.attr = dict()
+        self.attr['records'] = deque(maxlen=max_records)
+        self.attr['is_active'] = True
+
+    def write(self, record):
+        """Write a record."""
+        self.attr['records'].append(record)
+
+    def flush(self):
+        """Flush all pending records."""
+        pass
+
+    def get_records(self):
+        """Get all records in the buffer."""
+        return list(self.attr['records'])
+
+
+class FileSinkCls(MetaCls):
+    """Collect the monitoring records and append them to a file in batches."""
+
+    def __init__(self, fname='fit.copulpy.info', buffer_size=100):
+        """Init class."""
+        self.attr = dict()
+        self.attr['buffer_size'] = buffer_size
+        self.attr['is_active'] = True
+        self.attr['buffer'] = []
+
+        # The records are flushed to the same file even if the working directory changes.
+        self.attr['fname'] = os.path.abspath(fname)
+
+        atexit.register(self.flush)
+
+    def write(self, record):
+        """Write a record."""
+        buffer, buffer_size = self.get_attr('buffer', 'buffer_size')
+
+        buffer.append(record)
+        if len(buffer) >= buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Flush all pending records."""
+        buffer, fname = self.get_attr('buffer', 'fname')
+
+        if not buffer:
+            return
+
+        with open(fname, 'a') as outfile:
+            outfile.write(''.join(buffer))
+        del buffer[:]
+
+
+def set_monitoring_sink(sink, **kwargs):
+    """Select the sink for all monitoring records, either by label or as an instance."""
+    if sink in ['none']:
+        sink = NullSinkCls()
+    elif sink in ['memory']:
+        sink = MemorySinkCls(**kwargs)
+    elif sink in ['file']:
+        sink = FileSinkCls(**kwargs)
+    elif isinstance(sink, str):
+        raise NotImplementedError
+
+    # We flush the previous sink so that no records are lost when switching.
+    if 'sink' in _STATE.keys():
+        _STATE['sink'].flush()
+    _STATE['sink'] = sink
+
+    return sink
+
+
+def get_monitoring_sink():
+    """Get the current sink for all monitoring records."""
+    return _STATE['sink']
+
+
+_STATE = dict()
+set_monitoring_sink(MONITORING_SINK)
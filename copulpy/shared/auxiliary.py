@@ -1,4 +1,5 @@
 """Auxiliary functions."""
+import numpy as np
 
 
 def distribute_copula_spec(copula_spec, *keys):
@@ -32,3 +33,20 @@ def build_copula_spec(version, **kwargs):
             spec[version]['discounting'] = None
 
     return spec
+
+
+def get_periods(t):
+    """Get the periods as integers, where floats with integral values are accepted as well.
+
+    Periods that are not integral cannot be in any table, so a KeyError is raised for them.
+    """
+    t = np.asarray(t)
+    if t.dtype.kind in ['i', 'u']:
+        return t
+
+    with np.errstate(invalid='ignore'):
+        is_integral = np.isfinite(t) & (np.floor(t) == t)
+    if not np.all(is_integral):
+        raise KeyError(t[~is_integral] if t.ndim > 0 else t.item())
+
+    return t.astype(int)
@@ -0,0 +1,44 @@
+"""Provide the backend for the elementwise kernels that is shared by all classes of the package.
+
+In the 'numpy' backend, the kernels are evaluated with NumPy array expressions. In the 'numba'
+backend, the kernels are fused loops that are compiled just in time and run in parallel across
+cores. The 'numpy' backend is the default, as it is faster unless several cores are available,
+see testing/run_benchmark.py. Scalar requests are always evaluated in plain Python.
+"""
+from importlib import import_module
+import importlib.util
+
+import numpy as np
+
+from copulpy.config_copulpy import KERNEL_BACKEND
+
+# We only check whether numba is available here, as importing it takes some time.
+IS_NUMBA = importlib.util.find_spec('numba') is not None
+
+
+def set_backend(backend):
+    """Set the backend of the elementwise kernels for the whole package."""
+    np.testing.assert_equal(backend in ['numpy', 'numba'], True)
+
+    if backend in ['numba'] and not IS_NUMBA:
+        raise ImportError('... numba backend requested, but numba is not installed')
+
+    _STATE['backend'] = backend
+
+
+def get_backend():
+    """Get the backend of the elementwise kernels for the whole package."""
+    return _STATE['backend']
+
+
+def get_kernel(kernel):
+    """Get the implementation of the active backend for the NumPy implementation of a kernel."""
+    if _STATE['backend'] in ['numpy']:
+        return kernel
+
+    # The compiled kernels are only imported, and thus compiled, on first use.
+    return getattr(import_module('copulpy.kernels.kernels_numba'), kernel.__name__)
+
+
+_STATE = dict()
+set_backend(KERNEL_BACKEND)
@@ -0,0 +1,48 @@
+"""Provide the validation layer that is shared by all classes of the package.
+
+There are three validation modes. In the 'off' mode, no checks are performed at all. In the 'batch'
+mode, the public evaluation methods validate their request and return value once each, while the
+marginals and the copula evaluated by a utility copula and all internal helpers such as the
+generating functions skip their checks. In the 'full' mode, all debugging checks of the package
+are run.
+"""
+import numpy as np
+
+from copulpy.config_copulpy import VALIDATION_MODE
+from copulpy.shared.backend import get_kernel
+
+
+def set_validation_mode(mode):
+    """Set the validation mode for the whole package."""
+    np.testing.assert_equal(mode in ['off', 'batch', 'full'], True)
+    _STATE['mode'] = mode
+
+
+def get_validation_mode():
+    """Get the validation mode for the whole package."""
+    return _STATE['mode']
+
+
+def assert_range(x, lower=-np.inf, upper=np.inf):
+    """Assert that all values are finite and within the bounds."""
+    # Arrays are checked by the kernel of the active backend.
+    kernel = get_kernel(is_in_range) if np.ndim(x) > 0 else is_in_range
+    if not kernel(x, lower, upper):
+        raise AssertionError('... values out of range [{}, {}]'.format(lower, upper))
+
+
+def is_in_range(x, lower, upper):
+    """Check that all values are finite and within the bounds.
+
+    NumPy has no reduction for both extremes at once, so there are two reductions, but no
+    temporary arrays, which would be much slower for large arrays. The kernel of the numba backend
+    checks all values in a single pass instead.
+    """
+    x_min, x_max = np.min(x), np.max(x)
+
+    # A single NaN or infinite value renders one of the extremes non-finite.
+    return bool(np.isfinite(x_min) and np.isfinite(x_max) and lower <= x_min and x_max <= upper)
+
+
+_STATE = dict()
+set_validation_mode(VALIDATION_MODE)
@@ -1,6 +1,8 @@
 """This module contains some auxiliary functions that ease our testing efforts."""
 import numpy as np
 
+from copulpy.clsMeta import MetaCls
+
 
 def generate_random_request(constr=None):
     """Generate a random request to evaluate a multiattribute utility function."""
@@ -84,3 +86,12 @@ def generate_random_request(constr=None):
             raise NotImplementedError
 
     return x, y, is_normalized, copula_spec
+
+
+def get_attribute_tree(obj):
+    """Get the labels of the attributes of an instance and, recursively, of all its components."""
+    rslt = {'class': type(obj).__name__}
+    for key_, value in obj.attr.items():
+        rslt[key_] = get_attribute_tree(value) if isinstance(value, MetaCls) else None
+
+    return rslt
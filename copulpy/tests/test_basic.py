@@ -1,17 +1,48 @@
 """This module contains some tests for the development of sound multiattribute utility copulas."""
 from subprocess import CalledProcessError
+from functools import partial
 import pickle as pkl
 import subprocess
 import importlib
+import copy
 import socket    # noqa: F401
+import sys
 import os
 
+from scipy.optimize import least_squares
 import numpy as np
 import pytest
 
+from copulpy.monitoring.monitoring_sinks import set_monitoring_sink
+from copulpy.monitoring.monitoring_sinks import get_monitoring_sink
+from copulpy.shared.validation import get_validation_mode
+from copulpy.shared.validation import set_validation_mode
+from copulpy.shared.validation import assert_range
+from copulpy.shared.backend import get_backend
+from copulpy.shared.backend import set_backend
 from copulpy.tests.test_auxiliary import generate_random_request
+from copulpy.tests.test_auxiliary import get_attribute_tree
+from copulpy.clsCoefficientCache import CoefficientCacheCls
+from copulpy.clsCoefficientCache import COEFFICIENT_CACHE
+from copulpy.clsCopulaCache import CopulaCacheCls
+from copulpy.clsCopulaArchive import CopulaArchiveCls
+from copulpy.clsScaledArchimedean import ScaledArchimedeanCls
+from copulpy.clsScaledArchimedean import solve_coefficients_1
+from copulpy.clsScaledArchimedean import get_coefficients_batch
+from copulpy.clsScaledArchimedean import generating_function_1
+from copulpy.clsParallelEvaluator import ParallelEvaluatorCls
+from copulpy.clsRegressionVault import RegressionVaultCls
 from copulpy.clsUtilityCopula import UtilityCopulaCls
+from copulpy.clsPopulation import PopulationCls
+from copulpy.clsEstimation import EstimationCls
+from copulpy.clsExponential import ExponentialCls
+from copulpy.clsPower import PowerCls
+from copulpy.clsPeriodTable import PeriodTableCls
+from copulpy.clsNonstationaryUtil import nonstationary_kernel
+from copulpy.clsWarmglowUtil import warmglow_kernel
 from copulpy.config_copulpy import PACKAGE_DIR
+from copulpy.config_copulpy import HUGE_FLOAT
+from copulpy.shared.backend import get_kernel
 
 
 def test_1():
@@ -33,20 +64,7 @@ def test_1():
 @pytest.mark.skipif('acropolis' not in socket.gethostname(), reason='slight numerical differences')
 def test_2():
     """Run a subset of our regression vault."""
-    tests = pkl.load(open(PACKAGE_DIR + '/tests/regression_vault.copulpy.pkl', 'rb'))
-    for test in tests[:1000]:
-        rslt, x, y, period, is_normalized, copula_spec = test
-
-        # Temporary: Handle missing arguments that were added later. Remove once vault is refreshed.
-        version = copula_spec['version']
-        if version in ["warmglow"]:
-            if "warmglow_type" not in copula_spec[version].keys():
-                copula_spec[version]["warmglow_type"] = "constant"
-
-        copula = UtilityCopulaCls(copula_spec)
-        print(version)
-        np.testing.assert_almost_equal(
-            copula.evaluate(x=x, y=y, t=period, is_normalized=is_normalized), rslt)
+    RegressionVaultCls.load(PACKAGE_DIR + '/tests/regression_vault.copulpy').replay(1000)
 
 
 def test_3():
@@ -111,3 +129,717 @@ def test_5():
     except CalledProcessError:
         os.chdir(cwd)
         raise AssertionError('... code does not conform to style guide')
+
+
+def test_6():
+    """Ensure that the array evaluation of the utility functions matches the scalar one."""
+    for version in ['nonstationary', 'warmglow']:
+        constr = dict()
+        constr['version'] = version
+
+        for _ in range(10):
+            _, _, _, copula_spec = generate_random_request(constr)
+            copula = UtilityCopulaCls(copula_spec)
+
+            periods = list(copula_spec[version]['discount_factors'].keys())
+            t = np.random.choice(periods, 100)
+            x, y = np.random.uniform(0, 10, (2, 100))
+            x[:10], y[5:15] = 0.0, 0.0
+
+            rslt = [copula.evaluate(x=x[i], y=y[i], t=int(t[i])) for i in range(100)]
+            np.testing.assert_allclose(copula.evaluate(x=x, y=y, t=t), rslt, rtol=1e-10)
+
+
+def test_7():
+    """Ensure that the scaled Archimedean copula evaluates arrays with zero entries elementwise."""
+    constr = dict()
+    constr['version'] = 'scaled_archimedean'
+
+    for _ in range(10):
+        _, _, _, copula_spec = generate_random_request(constr)
+        copula = UtilityCopulaCls(copula_spec)
+
+        bounds = copula_spec['scaled_archimedean']['bounds']
+        x = np.random.uniform(0, bounds[0], 100)
+        y = np.random.uniform(0, bounds[1], 100)
+        x[:10], y[5:15] = 0.0, 0.0
+
+        rslt = [copula.evaluate(x=x[i], y=y[i]) for i in range(100)]
+        np.testing.assert_allclose(copula.evaluate(x=x, y=y), rslt, rtol=1e-10)
+
+
+def test_8():
+    """Ensure that the fitted coefficients are reused and survive a roundtrip to disk."""
+    constr = dict()
+    constr['version'] = 'scaled_archimedean'
+
+    _, _, _, copula_spec = generate_random_request(constr)
+
+    COEFFICIENT_CACHE.clear()
+    base = UtilityCopulaCls(copula_spec).attr['copula'].attr['m']
+    for _ in range(5):
+        np.testing.assert_equal(UtilityCopulaCls(copula_spec).attr['copula'].attr['m'], base)
+
+    stats = COEFFICIENT_CACHE.get_statistics()
+    np.testing.assert_equal((stats['hits'], stats['misses'], stats['size']), (5, 1, 1))
+
+    COEFFICIENT_CACHE.save('coefficients.copulpy.pkl')
+    cache = CoefficientCacheCls(max_size=1, fname='coefficients.copulpy.pkl')
+    np.testing.assert_equal(cache.get_statistics()['size'], 1)
+    np.testing.assert_equal(os.listdir('.'), ['coefficients.copulpy.pkl'])
+
+    # Files that are corrupted or stem from an earlier version are treated as an empty cache.
+    with open('coefficients.copulpy.pkl', 'rb') as infile:
+        data = infile.read()
+    items = list(COEFFICIENT_CACHE.attr['store'].items())
+    for content in [data[:len(data) // 2], pkl.dumps(items)]:
+        with open('coefficients.copulpy.pkl', 'wb') as outfile:
+            outfile.write(content)
+        cache = CoefficientCacheCls(fname='coefficients.copulpy.pkl')
+        np.testing.assert_equal(cache.get_statistics()['size'], 0)
+
+
+def test_9():
+    """Ensure that the closed-form share parameters solve the system of the copula."""
+    for _ in range(100):
+        u_1, u_2 = np.random.uniform(0.01, 0.99, 2)
+        delta = np.random.uniform(0.001, 5)
+
+        m = solve_coefficients_1(delta, u_1, u_2)
+        if m is None:
+            continue
+
+        copula = ScaledArchimedeanCls(1, u_1, u_2, delta)
+        np.testing.assert_allclose(copula.criterion(u_1, u_2, m), 0.0, atol=1e-10)
+
+        criterion = partial(copula.criterion, u_1, u_2)
+        opt = least_squares(criterion, [0.5, 0.5], bounds=[[0.01, 0.01], [0.99, 0.99]],
+                            xtol=1e-15, ftol=1e-15, gtol=1e-15)
+        np.testing.assert_allclose(m, opt['x'], atol=1e-8)
+
+
+def test_10():
+    """Ensure that the batch fitting of the share parameters fits as well as the scalar one."""
+    u_1, u_2 = np.random.uniform(0.01, 0.99, (2, 50))
+    delta = np.random.uniform(0.001, 5, 50)
+
+    m = get_coefficients_batch(u_1, u_2, delta)
+    np.testing.assert_equal(m.shape, (50, 2))
+
+    for i in range(50):
+        COEFFICIENT_CACHE.clear()
+        copula = ScaledArchimedeanCls(1, u_1[i], u_2[i], delta[i])
+
+        # Without a closed form, the scalar fit is the one of least_squares.
+        criterion = partial(copula.criterion, u_1[i], u_2[i])
+        if solve_coefficients_1(delta[i], u_1[i], u_2[i]) is None:
+            opt = least_squares(criterion, [0.5, 0.5], bounds=[[0.01, 0.01], [0.99, 0.99]])
+            np.testing.assert_equal(copula.attr['m'], opt['x'])
+        else:
+            np.testing.assert_allclose(m[i], copula.attr['m'], rtol=1e-12)
+
+        fun_batch, fun_scalar = criterion(m[i]), criterion(copula.attr['m'])
+        np.testing.assert_equal(np.sum(fun_batch ** 2) <= np.sum(fun_scalar ** 2) + 1e-8, True)
+
+
+def test_11():
+    """Ensure that the monitoring records end up in the selected sink only."""
+    constr = dict()
+    constr['version'] = 'scaled_archimedean'
+
+    _, _, _, copula_spec = generate_random_request(constr)
+
+    previous = get_monitoring_sink()
+    try:
+        # Without a sink, there is no disk I/O at all.
+        set_monitoring_sink('none')
+        files = os.listdir('.')
+
+        COEFFICIENT_CACHE.clear()
+        UtilityCopulaCls(copula_spec)
+        np.testing.assert_equal(os.listdir('.'), files)
+
+        sink = set_monitoring_sink('memory', max_records=3)
+        for _ in range(2):
+            COEFFICIENT_CACHE.clear()
+            UtilityCopulaCls(copula_spec)
+        records = sink.get_records()
+        np.testing.assert_equal(len(records), 3)
+        np.testing.assert_equal(records[-1].startswith(' Boundary Values'), True)
+
+        sink = set_monitoring_sink('file', fname='monitoring.copulpy.info', buffer_size=10)
+        COEFFICIENT_CACHE.clear()
+        UtilityCopulaCls(copula_spec)
+        np.testing.assert_equal(os.path.exists('monitoring.copulpy.info'), False)
+        sink.flush()
+        np.testing.assert_equal(os.path.exists('monitoring.copulpy.info'), True)
+    finally:
+        set_monitoring_sink(previous)
+
+
+def test_12():
+    """Ensure that the precomputed normalization of the marginals follows their parameters."""
+    for marginal_cls in [PowerCls, ExponentialCls]:
+        for _ in range(10):
+            r, upper_bound, a = np.random.uniform(0.001, 5, 3)
+            b = np.random.normal()
+
+            marginal = marginal_cls(r, a, b, upper_bound)
+            x = np.random.uniform(0, upper_bound, 10)
+
+            for _ in range(2):
+                base = marginal.evaluate(x) - marginal.evaluate(0.0)
+                base /= marginal.evaluate(upper_bound) - marginal.evaluate(0.0)
+                np.testing.assert_allclose(marginal.evaluate(x, is_normalized=True), base)
+
+                marginal.set_attr('r', np.random.uniform(0.001, 5))
+
+
+def test_13():
+    """Ensure that the precomputed denominator of the copula follows its parameters."""
+    for _ in range(10):
+        u_1, u_2 = np.random.uniform(0.01, 0.99, 2)
+        copula = ScaledArchimedeanCls(1, u_1, u_2, np.random.uniform(0.001, 5))
+
+        for _ in range(2):
+            np.testing.assert_almost_equal(copula.evaluate(1.0, 1.0), 1.0)
+
+            copula.set_attr('delta', np.random.uniform(0.001, 5))
+            copula.set_attr('m', np.random.uniform(0.01, 0.99, 2))
+
+
+def test_14():
+    """Ensure that the validation mode can be switched at runtime and is honored throughout."""
+    constr = dict()
+    constr['version'] = np.random.choice(['nonstationary', 'warmglow'])
+
+    _, _, _, copula_spec = generate_random_request(constr)
+    copula = UtilityCopulaCls(copula_spec)
+
+    previous = get_validation_mode()
+    try:
+        for mode in ['off', 'batch', 'full']:
+            set_validation_mode(mode)
+
+            # Invalid requests are only detected if validation is requested.
+            if mode in ['off']:
+                copula.evaluate(x=-1.0, y=1.0)
+                generating_function_1(1.0, 2.0)
+            else:
+                with pytest.raises(AssertionError):
+                    copula.evaluate(x=np.array([1.0, -1.0]), y=1.0)
+
+            # The generating functions are only checked in the full validation mode.
+            if mode in ['full']:
+                with pytest.raises(AssertionError):
+                    generating_function_1(1.0, 2.0)
+            else:
+                generating_function_1(1.0, 2.0)
+    finally:
+        set_validation_mode(previous)
+
+
+def test_15():
+    """Ensure that the period tables behave like the dictionaries they replace."""
+    periods = [0, 1, 3, 6, 12, 24]
+    table = {t: np.random.uniform(0.2, 1.0) for t in periods}
+    period_table = PeriodTableCls(table)
+
+    t_array = np.random.choice(periods, 100)
+    np.testing.assert_equal(period_table[t_array], [table[t_] for t_ in t_array])
+    np.testing.assert_equal(dict(period_table.items()), table)
+
+    for t in [2, 25, -1, np.array([1, 2])]:
+        with pytest.raises(KeyError):
+            period_table[t]
+
+    # Floats with integral values are valid periods, just like for the dictionaries.
+    np.testing.assert_equal(period_table[t_array.astype(float)], period_table[t_array])
+    np.testing.assert_equal(period_table[3.0], table[3])
+    np.testing.assert_equal(3.0 in period_table and 2.5 not in period_table, True)
+    for t in [2.5, np.nan, np.array([1.0, 0.5])]:
+        with pytest.raises(KeyError):
+            period_table[t]
+
+    with pytest.raises(AssertionError):
+        PeriodTableCls({0.5: 1.0, 1: 0.9})
+
+    constr = dict()
+    constr['version'] = np.random.choice(['nonstationary', 'warmglow'])
+    _, _, _, copula_spec = generate_random_request(constr)
+    copula = UtilityCopulaCls(copula_spec)
+
+    t = np.array(list(copula_spec[constr['version']]['discount_factors'].keys()))
+    np.testing.assert_equal(copula.evaluate(1.0, 2.0, t=float(t[-1])),
+                            copula.evaluate(1.0, 2.0, t=int(t[-1])))
+    np.testing.assert_equal(copula.evaluate(1.0, 2.0, t=t.astype(float)),
+                            copula.evaluate(1.0, 2.0, t=t))
+
+
+def test_16():
+    """Ensure that the closed-form discount functions are available for arbitrary periods."""
+    for version in ['nonstationary', 'warmglow']:
+        constr = dict()
+        constr['version'] = version
+
+        _, _, _, copula_spec = generate_random_request(constr)
+        copula_spec[version]['discounting'] = np.random.choice(['hyperbolic', 'exponential'])
+        copula_spec[version]['unrestricted_weights'] = None
+
+        discount_factors = copula_spec[version]['discount_factors']
+        copula = UtilityCopulaCls(copula_spec)
+
+        t = np.random.randint(0, 1000, 100)
+        x, y = np.random.uniform(0, 10, (2, 100))
+
+        rslt = [copula.evaluate(x=x[i], y=y[i], t=t[i]) for i in range(100)]
+        np.testing.assert_allclose(copula.evaluate(x=x, y=y, t=t), rslt, rtol=1e-10)
+
+        df = copula.attr['copula'].attr['discount_factors']
+        if copula_spec[version]['discounting'] in ['exponential']:
+            expected = np.where(t > 0, discount_factors[0] ** t, 1.0)
+        else:
+            expected = np.where(t > 0, discount_factors[0] * discount_factors[1] ** t, 1.0)
+        np.testing.assert_allclose(df[t], expected)
+
+        df = pkl.loads(pkl.dumps(df))
+        np.testing.assert_allclose(df[t], expected)
+
+
+def test_17():
+    """Ensure that the evaluation over a grid of parameters matches the individual evaluations."""
+    for version in ['nonstationary', 'warmglow']:
+        constr = dict()
+        constr['version'] = version
+
+        _, _, _, copula_spec = generate_random_request(constr)
+        copula = UtilityCopulaCls(copula_spec)
+
+        periods = list(copula_spec[version]['discount_factors'].keys())
+        t = np.random.choice(periods, 20)
+        x, y = np.random.uniform(0, 10, (2, 20))
+        x[:2], y[1:3] = 0.0, 0.0
+
+        params = dict()
+        for label in ['alpha', 'beta', 'gamma', 'y_scale']:
+            params[label] = np.random.uniform(0.1, 5.0, 5)
+
+        rslt = copula.evaluate_grid(x=x, y=y, t=t, **params)
+        np.testing.assert_equal(rslt.shape, (5, 20))
+
+        for i in range(5):
+            for label in params.keys():
+                copula_spec[version][label] = params[label][i]
+            base = UtilityCopulaCls(copula_spec).evaluate(x=x, y=y, t=t)
+            np.testing.assert_allclose(rslt[i], base, rtol=1e-10)
+
+
+def test_18():
+    """Ensure that the choice likelihoods of the estimation match a naive computation."""
+    constr = dict()
+    constr['version'] = np.random.choice(['nonstationary', 'warmglow'])
+
+    _, _, _, copula_spec = generate_random_request(constr)
+    version = copula_spec['version']
+
+    periods = list(copula_spec[version]['discount_factors'].keys())
+    t = np.random.choice(periods, 50)
+    x, y = np.random.uniform(0, 10, (2, 50, 3))
+    choices = np.random.randint(0, 3, 50)
+
+    estimation = EstimationCls(copula_spec, x, y, t, choices, choice_scale=2.0)
+    probs = estimation.get_choice_probabilities()
+    np.testing.assert_allclose(np.sum(probs, axis=1), 1.0)
+
+    copula = UtilityCopulaCls(copula_spec)
+    base = 0.0
+    for i in range(50):
+        utils = np.array([copula.evaluate(x[i, k], y[i, k], int(t[i])) for k in range(3)]) / 2.0
+        base += utils[choices[i]] - np.log(np.sum(np.exp(utils - utils.max()))) - utils.max()
+    np.testing.assert_allclose(estimation.get_log_likelihood(), base, rtol=1e-10)
+
+    # The criterion is the negative log-likelihood and also available for grids of parameters.
+    params = [copula_spec[version][label] for label in ['alpha', 'beta', 'gamma', 'y_scale']]
+    np.testing.assert_allclose(estimation.criterion(params), -base, rtol=1e-10)
+
+    grid = estimation.get_log_likelihood(alpha=np.random.uniform(0.1, 5.0, 4))
+    np.testing.assert_equal(grid.shape, (4,))
+
+
+def test_19():
+    """Ensure that the analytic parameter gradients match finite differences."""
+    constr = dict()
+    constr['version'] = np.random.choice(['nonstationary', 'warmglow'])
+
+    _, _, _, copula_spec = generate_random_request(constr)
+    version = copula_spec['version']
+
+    periods = list(copula_spec[version]['discount_factors'].keys())
+    t = np.random.choice(periods, 20)
+    x, y = np.random.uniform(0, 1, (2, 20, 3))
+    x[0, 0], y[1, 0] = 0.0, 0.0
+    choices = np.random.randint(0, 3, 20)
+
+    copula = UtilityCopulaCls(copula_spec)
+    utils, grad = copula.evaluate_gradient(x, y, t[:, None])
+    np.testing.assert_allclose(utils, copula.evaluate(x, y, t[:, None]), rtol=1e-10)
+
+    labels = ['alpha', 'beta', 'gamma', 'y_scale']
+    for label in labels:
+        value, step = copula_spec[version][label], 1e-6
+        upper = copula.evaluate_grid(x, y, t[:, None], **{label: value + step})
+        lower = copula.evaluate_grid(x, y, t[:, None], **{label: value - step})
+        np.testing.assert_allclose(grad[label], (upper - lower) / (2 * step), rtol=1e-4, atol=1e-4)
+
+    # The gradient of the criterion follows from the gradient of the utilities.
+    estimation = EstimationCls(copula_spec, x, y, t, choices, labels + ['choice_scale'], 2.0)
+    params = np.array([copula_spec[version][label] for label in labels] + [2.0])
+    rslt = estimation.criterion_gradient(params)
+    for i, step in enumerate(np.identity(5) * 1e-6):
+        fd = (estimation.criterion(params + step) - estimation.criterion(params - step)) / 2e-6
+        np.testing.assert_allclose(rslt[i], fd, rtol=1e-4, atol=1e-4)
+
+
+@pytest.mark.skipif(importlib.util.find_spec("numba") is None, reason='numba unavailable')
+def test_20():
+    """Ensure that the compiled kernels are numerically equivalent to the NumPy kernels."""
+    backend, mode = get_backend(), get_validation_mode()
+    try:
+        for _ in range(10):
+            _, _, _, copula_spec = generate_random_request()
+            copula = UtilityCopulaCls(copula_spec)
+            version = copula_spec['version']
+
+            # The number of points is large enough for the parallel loops to span several threads.
+            if version in ['scaled_archimedean']:
+                v = np.random.uniform(0, 1, (2, 20000))
+                x, y = v * np.array(copula_spec[version]['bounds'])[:, None]
+                t = 0
+            else:
+                periods = list(copula_spec[version]['discount_factors'].keys())
+                x, y = np.random.uniform(0, 1, (2, 20000))
+                t = np.random.choice(periods, 20000)
+            x[:10], y[5:15] = 0.0, 0.0
+
+            rslt = dict()
+            for label in ['numpy', 'numba']:
+                set_backend(label)
+                rslt[label] = copula.evaluate(x, y, t)
+                if version in ['scaled_archimedean']:
+                    rslt[label] = [rslt[label], copula.evaluate(*v, t, is_normalized=True)]
+
+            np.testing.assert_allclose(rslt['numba'], rslt['numpy'], rtol=1e-12)
+
+        # The requests are validated in the same way by both backends, even though the marginals
+        # are not evaluated separately by the compiled kernels.
+        _, _, _, copula_spec = generate_random_request({'version': 'scaled_archimedean'})
+        copula = UtilityCopulaCls(copula_spec)
+        x = np.tile(copula_spec['scaled_archimedean']['bounds'][0] + 1.0, 10)
+
+        set_validation_mode('batch')
+        for label in ['numpy', 'numba']:
+            set_backend(label)
+            with pytest.raises(AssertionError):
+                copula.evaluate(x, np.zeros(10))
+    finally:
+        set_validation_mode(mode)
+        set_backend(backend)
+
+
+def test_21():
+    """Ensure that the specialized evaluators are identical to the evaluate method."""
+    for _ in range(10):
+        x, y, is_normalized, copula_spec = generate_random_request()
+        copula = UtilityCopulaCls(copula_spec)
+        version = copula_spec['version']
+
+        evaluate = copula.evaluator(is_normalized)
+
+        periods = [0]
+        if version in ['nonstationary', 'warmglow']:
+            periods = list(copula_spec[version]['discount_factors'].keys())
+
+        for period in periods:
+            for args in [(x, y), (0.0, y), (x, 0.0), (0.0, 0.0)]:
+                base = copula.evaluate(*args, t=period, is_normalized=is_normalized)
+                np.testing.assert_equal(evaluate(*args, t=period), base)
+
+
+def test_22():
+    """Ensure that the attributes in slots are still available through the attribute interface."""
+    for _ in range(5):
+        x, y, is_normalized, copula_spec = generate_random_request()
+        copula = UtilityCopulaCls(copula_spec)
+        version = copula_spec['version']
+
+        np.testing.assert_equal(hasattr(copula, '__dict__'), False)
+        np.testing.assert_equal(copula.get_attr('version'), version)
+        np.testing.assert_equal(copula.attr['copula'] is copula.copula, True)
+        np.testing.assert_equal('version' in copula.attr, True)
+
+        # Attributes that are not set for the version are missing just like in a dictionary.
+        label = 'alpha' if version in ['scaled_archimedean'] else 'bounds'
+        np.testing.assert_equal(label in copula.attr.keys(), False)
+        pytest.raises(KeyError, copula.get_attr, label)
+
+        base = copula.evaluate(x, y, is_normalized=is_normalized)
+        rslt = pkl.loads(pkl.dumps(copula)).evaluate(x, y, is_normalized=is_normalized)
+        np.testing.assert_equal(rslt, base)
+
+
+def test_23():
+    """Ensure that the heavy dependencies are only imported on first use."""
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.path.dirname(PACKAGE_DIR)
+
+    cmd = 'import sys, copulpy; print(sorted(set(sys.modules) & {"scipy", "pytest", "numba"}))'
+    rslt = subprocess.check_output([sys.executable, '-c', cmd], env=env).decode().strip()
+    np.testing.assert_equal(rslt, '[]')
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason='shared memory requires Python 3.8')
+def test_24():
+    """Ensure that the evaluation in a process pool is identical to the serial evaluation."""
+    copula_specs = [generate_random_request()[3] for _ in range(5)]
+
+    x, y = np.random.uniform(0, 1, (2, 100))
+    t = np.random.choice([0, 1, 3, 6, 12, 24], 100)
+    subject_idx = np.random.randint(0, 5, 100)
+
+    base = []
+    for copula_spec in copula_specs:
+        copula = UtilityCopulaCls(copula_spec)
+        if copula_spec['version'] in ['scaled_archimedean']:
+            base += [copula.evaluate(x, y, is_normalized=True)]
+        else:
+            base += [copula.evaluate(x, y, t, is_normalized=True)]
+    base = np.array(base)
+
+    with ParallelEvaluatorCls(copula_specs, num_workers=2) as evaluator:
+        rslt = evaluator.evaluate(x, y, t, is_normalized=True)
+        np.testing.assert_equal(rslt, base)
+
+        rslt = evaluator.evaluate(x, y, t, is_normalized=True, subject_idx=subject_idx)
+        np.testing.assert_equal(rslt, base[subject_idx, np.arange(100)])
+
+        # Floats with integral values are valid periods, while all others are rejected.
+        rslt = evaluator.evaluate(x, y, t.astype(float), is_normalized=True)
+        np.testing.assert_equal(rslt, base)
+        with pytest.raises(KeyError):
+            evaluator.evaluate(x, y, t + 0.5, is_normalized=True)
+
+
+def test_25():
+    """Ensure that the population of utility functions matches the individual copulas."""
+    copula_specs = []
+    for _ in range(20):
+        constr = dict()
+        constr['version'] = np.random.choice(['nonstationary', 'warmglow'])
+        copula_spec = generate_random_request(constr)[3]
+
+        # The discounting is parametric for some of the subjects.
+        discounting = np.random.choice(['hyperbolic', 'exponential', None])
+        if discounting is not None:
+            copula_spec[constr['version']]['discounting'] = discounting
+            copula_spec[constr['version']]['unrestricted_weights'] = None
+        copula_specs += [copula_spec]
+
+    subject_idx = np.random.randint(0, 20, 500)
+    x, y = np.random.uniform(0, 2, (2, 500))
+    t = np.random.choice([0, 1, 3, 6, 12, 24], 500)
+    x[:10], y[5:15] = 0.0, 0.0
+
+    population = PopulationCls(copula_specs)
+    rslt = population.evaluate(subject_idx, x, y, t)
+
+    for i, copula_spec in enumerate(copula_specs):
+        is_subject = subject_idx == i
+        base = UtilityCopulaCls(copula_spec).evaluate(x[is_subject], y[is_subject], t[is_subject])
+        np.testing.assert_allclose(rslt[is_subject], base, rtol=1e-12)
+
+    np.testing.assert_equal(population.evaluate(subject_idx, x, y, t.astype(float)), rslt)
+
+    # The indices of the subjects are checked even without any validation.
+    mode = get_validation_mode()
+    try:
+        set_validation_mode('off')
+        for idx in [-1, 20]:
+            with pytest.raises(IndexError):
+                population.evaluate(idx, 1.0, 1.0, 0)
+    finally:
+        set_validation_mode(mode)
+
+
+def test_26():
+    """Ensure that the cache of copulas returns the same frozen copula for equal specifications."""
+    cache = CopulaCacheCls(max_size=2)
+
+    for _ in range(5):
+        copula_spec = generate_random_request()[3]
+        copula = cache.get_copula(copula_spec)
+
+        # The specification is rebuilt from scratch with different, but equal, types.
+        copula_spec_copy = pkl.loads(pkl.dumps(copula_spec))
+        for key_, value in copula_spec_copy[copula_spec['version']].items():
+            if isinstance(value, np.ndarray):
+                copula_spec_copy[copula_spec['version']][key_] = value.tolist()
+        np.testing.assert_equal(cache.get_copula(copula_spec_copy) is copula, True)
+
+        x, y = np.random.uniform(0, 1, (2, 10))
+        base = UtilityCopulaCls(copula_spec).evaluate(x, y)
+        np.testing.assert_equal(copula.evaluate(x, y), base)
+
+        np.testing.assert_raises(AttributeError, copula.set_attr, 'version', 'warmglow')
+        np.testing.assert_raises(AttributeError, copula.copula.set_attr, 'delta', 0.5)
+
+        # Copies remain frozen, and the components and arrays are immutable as well.
+        for copula_copy in [pkl.loads(pkl.dumps(copula)), copy.deepcopy(copula)]:
+            np.testing.assert_equal(copula_copy.evaluate(x, y), base)
+            np.testing.assert_raises(AttributeError, copula_copy.set_attr, 'version', 'warmglow')
+
+        if copula_spec['version'] in ['scaled_archimedean']:
+            np.testing.assert_equal(copula.bounds is copula_spec['scaled_archimedean']['bounds'],
+                                    False)
+            np.testing.assert_raises(ValueError, copula.bounds.__setitem__, 0, 1.0)
+        else:
+            np.testing.assert_raises(TypeError, copula.discount_factors.__setitem__, 0, 1.0)
+            if isinstance(copula.copula.discount_factors, PeriodTableCls):
+                values = copula.copula.discount_factors.attr['values']
+                np.testing.assert_raises(ValueError, values.__setitem__, slice(None), 0.0)
+
+    stats = cache.get_statistics()
+    np.testing.assert_equal(stats['size'], 2)
+    np.testing.assert_equal((stats['hits'], stats['misses'], stats['evictions']), (5, 5, 3))
+
+
+def test_27():
+    """Ensure that the copulas restored from an archive match the original copulas."""
+    copulas = [UtilityCopulaCls(generate_random_request()[3]) for _ in range(10)]
+
+    CopulaArchiveCls.from_copulas(copulas).save('copulas.copulpy.npz')
+    archive = CopulaArchiveCls.load('copulas.copulpy.npz')
+    np.testing.assert_equal(len(archive), 10)
+
+    x, y = np.random.uniform(0, 1, (2, 100))
+    t = np.random.choice([0, 1, 3, 6, 12, 24], 100)
+    for copula, restored in zip(copulas, archive):
+        args = [(x, y, t, False)]
+        if copula.version in ['scaled_archimedean']:
+            bounds = copula.attr['bounds']
+            args = [(x, y, 0, True), (x * bounds[0], y * bounds[1], 0, False)]
+
+        for arg in args:
+            np.testing.assert_equal(restored.evaluate(*arg), copula.evaluate(*arg))
+
+        # All attributes are restored, including those of the components.
+        np.testing.assert_equal(get_attribute_tree(restored), get_attribute_tree(copula))
+
+        restored = UtilityCopulaCls.from_bytes(copula.to_bytes())
+        np.testing.assert_equal(restored.evaluate(*args[-1]), copula.evaluate(*args[-1]))
+
+
+def test_28():
+    """Ensure that the regression vault replays its tests after a round trip to disk."""
+    tests = []
+    for _ in range(20):
+        x, y, is_normalized, copula_spec = generate_random_request()
+        copula = UtilityCopulaCls(copula_spec)
+
+        periods = [0]
+        if copula_spec['version'] in ['nonstationary', 'warmglow']:
+            periods = copula_spec[copula_spec['version']]['discount_factors'].keys()
+
+        for period in periods:
+            rslt = copula.evaluate(x=x, y=y, t=period, is_normalized=is_normalized)
+            tests += [[rslt, x, y, period, is_normalized, copula_spec]]
+
+    # Each specification is stored only once, while the tests repeat it for all periods.
+    RegressionVaultCls.from_tests(tests).save('regression_vault.copulpy')
+    vault = RegressionVaultCls.load('regression_vault.copulpy')
+    np.testing.assert_equal(len(vault.attr['archive']), 20)
+
+    np.testing.assert_equal(vault.replay().size, 0)
+
+    # All mismatches are collected, while a single large deviation fails the replay.
+    columns = vault.attr['columns']
+    scale = np.maximum(np.abs(columns['rslt']), 1.0)
+    columns['rslt'] = columns['rslt'] + 1e-6 * scale
+    np.testing.assert_equal(vault.replay(max_share=1.0).size, len(tests))
+    np.testing.assert_raises(AssertionError, vault.replay)
+
+    columns['rslt'][0] += scale[0]
+    np.testing.assert_raises(AssertionError, vault.replay, max_share=1.0)
+
+
+def test_29():
+    """Ensure that the derived attributes follow their inputs when these are set directly."""
+    for marginal_cls in [PowerCls, ExponentialCls]:
+        r, upper_bound, a = np.random.uniform(0.001, 5, 3)
+        marginal = marginal_cls(r, a, np.random.normal(), upper_bound)
+
+        marginal.r, marginal.upper_bound = np.random.uniform(0.001, 5, 2)
+        base = marginal_cls(marginal.r, marginal.a, marginal.b, marginal.upper_bound)
+        np.testing.assert_equal(marginal.normalization, base.normalization)
+        np.testing.assert_equal(sorted(marginal.attr.keys()), sorted(base.attr.keys()))
+
+    for _ in range(5):
+        u_1, u_2 = np.random.uniform(0.01, 0.99, 2)
+        copula = ScaledArchimedeanCls(1, u_1, u_2, np.random.uniform(0.001, 5))
+
+        copula.delta, copula.u_1 = np.random.uniform(0.001, 5), np.random.uniform(0.01, 0.99)
+        base = ScaledArchimedeanCls(1, copula.u_1, u_2, copula.delta)
+        np.testing.assert_equal(copula.m, base.m)
+        np.testing.assert_equal(copula.denominator, base.denominator)
+        np.testing.assert_equal(copula.evaluate(0.5, 0.5), base.evaluate(0.5, 0.5))
+
+
+def test_30():
+    """Ensure that a sample of the regression vault replays within its historic tolerance."""
+    vault = RegressionVaultCls.load(PACKAGE_DIR + '/tests/regression_vault.copulpy')
+    mismatches = vault.replay(500)
+    np.testing.assert_equal(mismatches.size <= 0.025 * 500, True)
+
+
+def test_31():
+    """Ensure that the range check detects all values that are out of range or not finite."""
+    backends = ['numpy'] + (['numba'] if importlib.util.find_spec("numba") is not None else [])
+
+    backend = get_backend()
+    try:
+        for label in backends:
+            set_backend(label)
+            x = np.random.uniform(0, 1, 100)
+            assert_range(x, 0.0, 1.0)
+            assert_range(x)
+
+            for value, lower, upper in [(-0.1, 0.0, 1.0), (1.1, 0.0, 1.0), (np.nan, 0.0, 1.0),
+                                        (np.inf, 0.0, np.inf), (-np.inf, -np.inf, 1.0)]:
+                x_invalid = np.copy(x)
+                x_invalid[np.random.randint(100)] = value
+                for arg in [value, x_invalid]:
+                    with pytest.raises(AssertionError):
+                        assert_range(arg, lower, upper)
+    finally:
+        set_backend(backend)
+
+
+def test_32():
+    """Ensure that an overflow results in the same huge value whichever of x and y is zero."""
+    backends = ['numpy'] + (['numba'] if importlib.util.find_spec("numba") is not None else [])
+
+    x, y = np.array([1e300, 0.0, 1e300, 0.0]), np.array([0.0, 1e300, 1e300, 0.0])
+    expected = [HUGE_FLOAT, HUGE_FLOAT, HUGE_FLOAT, 0.0]
+
+    backend = get_backend()
+    try:
+        for label in backends:
+            set_backend(label)
+            kernel = get_kernel(nonstationary_kernel)
+            np.testing.assert_equal(kernel(x, y, 0.5, 2.0, 1.0, 0.9, 1.0), expected)
+
+            for warmglow_type in ['constant', 'linear']:
+                kernel = get_kernel(warmglow_kernel)
+                rslt = kernel(x, y, 0.5, 2.0, 0.5, 0.9, 1.0, warmglow_type)
+                np.testing.assert_equal(rslt, expected)
+    finally:
+        set_backend(backend)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+"""This script benchmarks the construction and the evaluation of the copulas.
+
+For each version, we time the construction including the fitting, the latency of single
+evaluations, and the throughput of batched evaluations for sizes from 1 up to 10 ** 7 together with
+the peak of the memory that is allocated by them. The copulas are drawn by generate_random_request.
+All results are written to a JSON file, so that they can be compared across releases. The backend
+and the validation mode are those of the environment, see config_copulpy.py.
+
+The memory peak is traced with tracemalloc, which covers all allocations of NumPy but not those
+within the compiled kernels. The maximum resident set size of the whole run is recorded as well.
+"""
+import tracemalloc
+import argparse
+import platform
+import json
+import time
+import sys
+
+import numpy as np
+
+from copulpy.tests.test_auxiliary import generate_random_request
+from copulpy.shared.validation import get_validation_mode
+from copulpy.clsCoefficientCache import COEFFICIENT_CACHE
+from copulpy.clsUtilityCopula import UtilityCopulaCls
+from copulpy.shared.backend import get_backend
+
+VERSIONS = ['scaled_archimedean', 'nonstationary', 'warmglow']
+
+# The number of repetitions for the construction and the single evaluations.
+NUM_REPEATS = 5
+NUM_CALLS = 1000
+
+# The batched evaluations are repeated until this many seconds have passed.
+MIN_DURATION = 0.2
+
+
+def get_summary(times):
+    """Summarize the times in seconds as microseconds across all copulas."""
+    times = np.array(times) * 1e6
+
+    rslt = dict()
+    rslt['median'] = float(np.median(times))
+    rslt['min'] = float(np.min(times))
+    rslt['max'] = float(np.max(times))
+
+    return rslt
+
+
+def get_bundles(copula_spec, size):
+    """Draw random bundles and periods of the requested size."""
+    version = copula_spec['version']
+
+    if version in ['scaled_archimedean']:
+        bounds = copula_spec[version]['bounds']
+        x = np.random.uniform(0, bounds[0], size)
+        y = np.random.uniform(0, bounds[1], size)
+        t = 0
+    else:
+        x, y = np.random.uniform(0, 10, (2, size))
+        t = np.random.choice(list(copula_spec[version]['discount_factors'].keys()), size)
+
+    return x, y, t
+
+
+def benchmark_construction(copula_specs):
+    """Time the construction of each copula, which includes the fitting."""
+    times = []
+    for copula_spec in copula_specs:
+        best = np.inf
+        for _ in range(NUM_REPEATS):
+            # The share parameters are otherwise taken from the cache after the first fit.
+            COEFFICIENT_CACHE.clear()
+
+            start = time.perf_counter()
+            UtilityCopulaCls(copula_spec)
+            best = min(best, time.perf_counter() - start)
+
+        times += [best]
+
+    return get_summary(times)
+
+
+def benchmark_scalar(copula_specs):
+    """Time single evaluations of each copula."""
+    times = []
+    for copula_spec in copula_specs:
+        copula = UtilityCopulaCls(copula_spec)
+        x, y, t = get_bundles(copula_spec, 1)
+        x, y, t = float(x[0]), float(y[0]), int(np.ravel(t)[0])
+
+        copula.evaluate(x, y, t)
+
+        start = time.perf_counter()
+        for _ in range(NUM_CALLS):
+            copula.evaluate(x, y, t)
+        times += [(time.perf_counter() - start) / NUM_CALLS]
+
+    return get_summary(times)
+
+
+def benchmark_batched(copula_spec, max_exponent):
+    """Time batched evaluations of a copula and record the peak of their memory allocations."""
+    copula = UtilityCopulaCls(copula_spec)
+
+    rslt = []
+    for size in [10 ** exponent for exponent in range(max_exponent + 1)]:
+        x, y, t = get_bundles(copula_spec, size)
+
+        # The first evaluation is not measured, as it may compile the kernels.
+        copula.evaluate(x, y, t)
+
+        tracemalloc.start()
+        copula.evaluate(x, y, t)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        num_calls, duration = 0, 0.0
+        start = time.perf_counter()
+        while duration < MIN_DURATION:
+            copula.evaluate(x, y, t)
+            duration = time.perf_counter() - start
+            num_calls += 1
+
+        record = dict()
+        record['size'] = size
+        record['seconds'] = duration / num_calls
+        record['throughput'] = size * num_calls / duration
+        record['memory_peak'] = peak
+        rslt += [record]
+
+    return rslt
+
+
+def get_max_rss():
+    """Get the maximum resident set size of the process in bytes, if it is available."""
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # The size is reported in kilobytes on Linux and in bytes on macOS.
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform in ['darwin'] else max_rss * 1024
+
+
+def get_metadata(args):
+    """Collect the information about the setup of the benchmark."""
+    rslt = dict()
+    rslt['time'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    rslt['python'] = platform.python_version()
+    rslt['numpy'] = np.__version__
+    rslt['platform'] = platform.platform()
+    rslt['backend'] = get_backend()
+    rslt['validation_mode'] = get_validation_mode()
+    rslt['seed'] = args.seed
+    rslt['num_specs'] = args.num_specs
+    rslt['max_exponent'] = args.max_exponent
+
+    return rslt
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Benchmark the copulas of the package.')
+    parser.add_argument('--output', default='benchmark.copulpy.json',
+                        help='name of the JSON file with the results')
+    parser.add_argument('--seed', type=int, default=123, help='seed for the random copulas')
+    parser.add_argument('--num-specs', type=int, default=20,
+                        help='number of random copulas per version')
+    parser.add_argument('--max-exponent', type=int, default=7,
+                        help='batched evaluations for sizes up to 10 ** max-exponent')
+    args = parser.parse_args()
+
+    np.random.seed(args.seed)
+
+    results = dict()
+    results['metadata'] = get_metadata(args)
+    for version in VERSIONS:
+        constr = {'version': version}
+        copula_specs = [generate_random_request(constr)[3] for _ in range(args.num_specs)]
+
+        results[version] = dict()
+        results[version]['construction'] = benchmark_construction(copula_specs)
+        results[version]['scalar'] = benchmark_scalar(copula_specs)
+
+        # The batched evaluations take long for large sizes, so they use only the first copula.
+        results[version]['batched'] = benchmark_batched(copula_specs[0], args.max_exponent)
+
+        print('\n {:<20} construction {:10.2f} us   single evaluation {:10.2f} us\n'.format(
+            version, results[version]['construction']['median'],
+            results[version]['scalar']['median']))
+        for record in results[version]['batched']:
+            print(' {:>10} bundles {:16.0f} per second {:16d} bytes'.format(
+                record['size'], record['throughput'], record['memory_peak']))
+
+    results['metadata']['max_rss'] = get_max_rss()
+
+    with open(args.output, 'w') as outfile:
+        json.dump(results, outfile, indent=4)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""This script benchmarks the time it takes to import the package.
+
+The import times are taken from the output of python -X importtime in fresh processes. We report
+the median cumulative time of the package and its modules with the largest own import time.
+"""
+import subprocess
+import sys
+import os
+
+import numpy as np
+
+from copulpy.config_copulpy import PACKAGE_DIR
+
+NUM_RUNS = 10
+NUM_MODULES = 15
+
+# These dependencies are only imported on first use and should never show up here.
+DEFERRED = ['scipy', 'pytest', 'numba']
+
+
+def get_import_times(module):
+    """Get the own and cumulative import times of all modules in microseconds."""
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.path.dirname(PACKAGE_DIR)
+
+    cmd = [sys.executable, '-X', 'importtime', '-c', 'import ' + module]
+    stderr = subprocess.run(cmd, env=env, stderr=subprocess.PIPE, check=True).stderr
+
+    rslt = dict()
+    for line in stderr.decode().splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        rslt[name.strip()] = int(own), int(cumulative)
+
+    return rslt
+
+
+if __name__ == '__main__':
+
+    runs = [get_import_times('copulpy') for _ in range(NUM_RUNS)]
+
+    cumulative = np.median([run['copulpy'][1] for run in runs]) / 1e3
+    print('\n Import of copulpy (median of {} runs): {:8.2f} ms\n'.format(NUM_RUNS, cumulative))
+
+    # The modules with the largest own import time in the last run.
+    modules = sorted(runs[-1].items(), key=lambda item: item[1][0], reverse=True)
+    for name, (own, _) in modules[:NUM_MODULES]:
+        print(' {:<50} {:8.2f} ms'.format(name, own / 1e3))
+
+    deferred = [name for name in runs[-1] if name.split('.')[0] in DEFERRED]
+    if deferred:
+        print('\n Deferred dependencies imported eagerly: {}'.format(', '.join(sorted(deferred))))
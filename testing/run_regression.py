@@ -1,9 +1,7 @@
 #!/usr/bin/env python
 """This module is a first take at regression tests."""
-import pickle as pkl
-import numpy as np
-
 from copulpy.tests.test_auxiliary import generate_random_request
+from copulpy.clsRegressionVault import RegressionVaultCls
 from copulpy.clsUtilityCopula import UtilityCopulaCls
 from copulpy.config_copulpy import PACKAGE_DIR
 
@@ -31,19 +29,10 @@ if True:
         else:
             raise NotImplementedError
 
-    pkl.dump(tests, open(PACKAGE_DIR + '/tests/regression_vault.copulpy.pkl', 'wb'))
-
-# Run regression test
-tests = pkl.load(open(PACKAGE_DIR + '/tests/regression_vault.copulpy.pkl', 'rb'))
-totaltests = len(tests)
-counter = 0
-
-for test in tests:
-    counter += 1
-
-    rslt, x, y, period, is_normalized, copula_spec = test
-    version = copula_spec['version']
-    copula = UtilityCopulaCls(copula_spec)
+    RegressionVaultCls.from_tests(tests).save(PACKAGE_DIR + '/tests/regression_vault.copulpy')
 
-    np.testing.assert_almost_equal(
-        copula.evaluate(x=x, y=y, t=period, is_normalized=is_normalized), rslt)
+# Run regression test, where all tests of a copula are evaluated at once.
+vault = RegressionVaultCls.load(PACKAGE_DIR + '/tests/regression_vault.copulpy')
+mismatches = vault.replay()
+print('{:} of {:} tests mismatch in the first seven decimals.'.format(
+    mismatches.size, vault.attr['num_tests']))